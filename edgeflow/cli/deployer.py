@@ -14,7 +14,7 @@ from kubernetes import client, config
 from edgeflow.constants import (
     REDIS_HOST, REDIS_PORT, 
     GATEWAY_TCP_PORT, GATEWAY_HTTP_PORT, 
-    DATA_REDIS_HOST, DATA_REDIS_PORT
+    DATA_REDIS_HOST, DATA_REDIS_PORT, DATA_REDIS_SHARD_PORT
 )
 from edgeflow.qos import QoS
 from .builder import build_all_nodes
@@ -49,20 +49,43 @@ def ensure_namespace(k8s_core, namespace: str):
             raise e
 
 
-def ensure_infra_resource(k8s_apps, k8s_core, namespace: str, template_name: str):
-    """Deploy infrastructure template (Redis etc.)"""
+def remove_legacy_deployment(k8s_apps, namespace: str, name: str):
+    """
+    Delete a Deployment replaced by a StatefulSet of the same name (redis-data before sharding)
+    - Both would match the same selector behind one Service -> clients reach either Pod at random
+    """
+    try:
+        k8s_apps.read_namespaced_deployment(name=name, namespace=namespace)
+    except client.exceptions.ApiException as e:
+        if e.status == 404:
+            return
+        raise e
+    print(f"  🧹 [Infra] Removing legacy Deployment/{name} (replaced by StatefulSet)")
+    k8s_apps.delete_namespaced_deployment(name=name, namespace=namespace)
+
+
+def ensure_infra_resource(k8s_apps, k8s_core, namespace: str, template_name: str, **context):
+    """Deploy infrastructure template (Redis etc.), rendered with context (e.g. replicas)"""
     tpl_path = os.path.join(os.path.dirname(__file__), 'templates', template_name)
     with open(tpl_path, encoding='utf-8') as f:
-        manifests = list(yaml.safe_load_all(f.read()))
+        manifests = list(yaml.safe_load_all(Template(f.read()).render(**context)))
 
     for manifest in manifests:
         kind = manifest['kind']
         name = manifest['metadata']['name']
+        if kind == 'StatefulSet':
+            remove_legacy_deployment(k8s_apps, namespace, name)
         try:
             if kind == 'Service':
                 k8s_core.read_namespaced_service(name=name, namespace=namespace)
             elif kind == 'Deployment':
                 k8s_apps.read_namespaced_deployment(name=name, namespace=namespace)
+            elif kind == 'StatefulSet':
+                current = k8s_apps.read_namespaced_stateful_set(name=name, namespace=namespace)
+                # Shard count changed -> scale (existing Pods keep their ordinal / DNS)
+                if current.spec.replicas != manifest['spec']['replicas']:
+                    print(f"  🔄 [Infra] Scaling {kind}/{name}: {current.spec.replicas} -> {manifest['spec']['replicas']}")
+                    k8s_apps.patch_namespaced_stateful_set(name=name, namespace=namespace, body=manifest)
         except client.exceptions.ApiException as e:
             if e.status == 404:
                 print(f"  ⚠️ [Infra] {kind}/{name} missing. Creating...")
@@ -70,10 +93,26 @@ def ensure_infra_resource(k8s_apps, k8s_core, namespace: str, template_name: str
                     k8s_core.create_namespaced_service(namespace=namespace, body=manifest)
                 elif kind == 'Deployment':
                     k8s_apps.create_namespaced_deployment(namespace=namespace, body=manifest)
+                elif kind == 'StatefulSet':
+                    k8s_apps.create_namespaced_stateful_set(namespace=namespace, body=manifest)
             else:
                 raise e
 
 
+def data_shard_hosts(broker, namespace: str = "default") -> List[str]:
+    """
+    In-cluster data Redis shards for a sharded DualRedisBroker ([] otherwise)
+    - One StatefulSet Pod per configured data host: edgeflow-redis-data-{i} (stable DNS via the headless service)
+    """
+    shards = (broker.to_config().get("data_hosts") or []) if broker is not None else []
+    if len(shards) < 2:
+        return []
+    return [
+        f"edgeflow-redis-data-{i}.{DATA_REDIS_HOST}.{namespace}.svc.cluster.local:{DATA_REDIS_SHARD_PORT}"
+        for i in range(len(shards))
+    ]
+
+
 def ensure_infrastructure(k8s_apps, k8s_core, broker, namespace: str = "default"):
     """Deploy required Redis infrastructure based on broker type"""
     from edgeflow.comms.brokers.dual_redis import DualRedisBroker
@@ -83,10 +122,11 @@ def ensure_infrastructure(k8s_apps, k8s_core, broker, namespace: str = "default"
     # Basic Redis (Control Plane) - always deploy
     ensure_infra_resource(k8s_apps, k8s_core, namespace, 'redis.yaml.j2')
 
-    # Dual Mode -> also deploy Data Redis
+    # Dual Mode -> also deploy Data Redis (one replica per data shard)
     if isinstance(broker, DualRedisBroker):
-        print(f"  🚀 Dual Mode Detected! Deploying Data Redis...")
-        ensure_infra_resource(k8s_apps, k8s_core, namespace, 'redis-data.yaml.j2')
+        replicas = max(1, len(data_shard_hosts(broker, namespace)))
+        print(f"  🚀 Dual Mode Detected! Deploying Data Redis (shards: {replicas})...")
+        ensure_infra_resource(k8s_apps, k8s_core, namespace, 'redis-data.yaml.j2', replicas=replicas)
     
     print("  ✅ Infrastructure Ready.")
 
@@ -123,6 +163,9 @@ def deploy_to_k8s(
         with open(svc_tpl_path, encoding='utf-8') as f:
             svc_template = Template(f.read())
 
+    # Sharded data plane -> nodes connect to every data Redis Pod directly
+    data_hosts = ",".join(data_shard_hosts(getattr(system, 'broker', None), namespace))
+
     # Build per-node images
     node_paths = [spec.path for spec in system.specs.values()]
     
@@ -164,6 +207,7 @@ def deploy_to_k8s(
                     "REDIS_PORT": str(REDIS_PORT),
                     "DATA_REDIS_HOST": f"{DATA_REDIS_HOST}.{namespace}.svc.cluster.local",
                     "DATA_REDIS_PORT": str(DATA_REDIS_PORT),
+                    "DATA_REDIS_HOSTS": data_hosts,
                     "GATEWAY_HOST": f"gateway-svc.{namespace}.svc.cluster.local",
                     "GATEWAY_TCP_PORT": str(GATEWAY_TCP_PORT),
                     "NODE_NAME": name
@@ -218,6 +262,7 @@ def deploy_to_k8s(
                 "REDIS_PORT": str(REDIS_PORT),
                 "DATA_REDIS_HOST": f"{DATA_REDIS_HOST}.{namespace}.svc.cluster.local",
                 "DATA_REDIS_PORT": str(DATA_REDIS_PORT),
+                "DATA_REDIS_HOSTS": data_hosts,
                 "GATEWAY_HOST": f"gateway-svc.{namespace}.svc.cluster.local",
                 "GATEWAY_TCP_PORT": str(GATEWAY_TCP_PORT),
                 "NODE_NAME": name,
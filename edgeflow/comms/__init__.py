@@ -1,6 +1,7 @@
 #edgeflow/comms/__init__.py
-from .brokers import RedisBroker, DualRedisBroker, BrokerInterface 
+from .brokers import RedisBroker, DualRedisBroker, SharedMemoryBroker, MemoryBroker, BrokerInterface 
 from .frame import Frame
+from .codecs import Codec, register_codec, get_codec
 from .socket_client import GatewaySender
 
-__all__ = ["Frame", "RedisBroker", "DualRedisBroker", "BrokerInterface", "GatewaySender"]
\ No newline at end of file
+__all__ = ["Frame", "Codec", "register_codec", "get_codec", "RedisBroker", "DualRedisBroker", "SharedMemoryBroker", "MemoryBroker", "BrokerInterface", "GatewaySender"]
\ No newline at end of file
@@ -2,6 +2,8 @@ from .base import BrokerInterface
 from .redis import RedisBroker
 
 from .dual_redis import DualRedisBroker
+from .shm import SharedMemoryBroker
+from .memory import MemoryBroker
 
 # 나중에 RabbitMQBroker 등이 생기면 여기에 추가
-__all__ = ["BrokerInterface", "RedisBroker", "DualRedisBroker"]
\ No newline at end of file
+__all__ = ["BrokerInterface", "RedisBroker", "DualRedisBroker", "SharedMemoryBroker", "MemoryBroker"]
\ No newline at end of file
@@ -1,4 +1,5 @@
 #edgeflow/comms/brokers/base.py
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any
 
@@ -7,11 +8,21 @@ class BrokerInterface(ABC):
     모든 Broker가 구현해야 하는 인터페이스입니다.
     노드들은 이 인터페이스에만 의존하게 됩니다.
     """
+    # True: push()가 Frame 객체를 직렬화 없이 그대로 받는 in-process 브로커 (MemoryBroker)
+    accepts_frames = False
+
     @abstractmethod
     def push(self, topic: str, data: bytes):
         """데이터를 브로커에 푸시합니다."""
         pass
 
+    def push_buffers(self, topic: str, buffers: list):
+        """
+        버퍼 리스트(Frame.to_buffers)를 하나의 메시지로 푸시합니다.
+        - 기본 구현은 이어 붙여서 push() 호출, 복사 없이 보낼 수 있는 브로커는 재정의합니다.
+        """
+        self.push(topic, b''.join(buffers))
+
     @abstractmethod
     def pop(self, topic: str, timeout: int = 0) -> bytes | None:
         """브로커에서 데이터를 팝합니다."""
@@ -31,6 +42,14 @@ class BrokerInterface(ABC):
         """스트림의 크기를 관리합니다."""
         pass
 
+    def register_topic(self, topic: str, maxlen: int, approximate: bool = True):
+        """
+        토픽의 스트림 최대 길이를 배선(wiring) 시점에 한 번 등록합니다.
+        - approximate: True면 근사 트리밍 (Redis MAXLEN ~, 더 저렴), False면 정확히 maxlen 유지
+        - 기본 구현은 trim() 한 번, 푸시마다 길이를 적용할 수 있는 브로커(Redis 계열)는 재정의합니다.
+        """
+        self.trim(topic, maxlen)
+
     @abstractmethod
     def queue_size(self, topic: str) -> int:
         """현재 토픽 대기열의 크기를 반환합니다."""
@@ -41,6 +60,13 @@ class BrokerInterface(ABC):
         """모든 대기열의 상태(current, max)를 반환합니다."""
         pass
     
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        비동기(write-behind)로 대기 중인 푸시가 모두 저장될 때까지 기다립니다 (선택적 구현).
+        - 모두 저장되면 True, timeout 초과 시 False
+        """
+        return True
+
     def reset(self):
         """
         브로커의 상태를 초기화합니다 (선택적 구현).
@@ -49,6 +75,34 @@ class BrokerInterface(ABC):
         """
         pass
     
+    # ========== Async API (asyncio 노드 / Gateway용) ==========
+    # 기본 구현은 동기 메서드를 스레드에서 실행 (이벤트 루프를 막지 않음)
+    # 네이티브 비동기 클라이언트가 있는 브로커(Redis 계열)는 재정의합니다.
+
+    async def apush(self, topic: str, data: bytes):
+        """push()의 비동기 버전"""
+        await asyncio.to_thread(self.push, topic, data)
+
+    async def apush_buffers(self, topic: str, buffers: list):
+        """push_buffers()의 비동기 버전"""
+        await asyncio.to_thread(self.push_buffers, topic, buffers)
+
+    async def apop(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker") -> bytes | None:
+        """pop()의 비동기 버전"""
+        return await asyncio.to_thread(self.pop, topic, timeout, group, consumer)
+
+    async def apop_latest(self, topic: str, timeout: int = 1) -> bytes | None:
+        """pop_latest()의 비동기 버전"""
+        return await asyncio.to_thread(self.pop_latest, topic, timeout)
+
+    async def aqueue_size(self, topic: str) -> int:
+        """queue_size()의 비동기 버전"""
+        return await asyncio.to_thread(self.queue_size, topic)
+
+    async def aget_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """get_queue_stats()의 비동기 버전"""
+        return await asyncio.to_thread(self.get_queue_stats)
+
     # ========== Serialization Protocol (Multiprocessing Support) ==========
     
     @abstractmethod
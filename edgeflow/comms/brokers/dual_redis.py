@@ -5,12 +5,66 @@ Dual Redis Stream-based Broker
 - Data Redis: Blob storage for large payloads
 """
 import redis.exceptions
-import struct
+import redis.asyncio as aioredis
+import atexit
+import hashlib
+import queue
+import threading
 import time
 import os
+from collections import deque
 from typing import Dict
 from .base import BrokerInterface
+from .redis import LATEST_ENTRY_LUA, QUEUE_STATS_LUA, TOPICS_KEY, QueueStatsCache, parse_queue_stats
+from ..frame import Frame
 from ...config import settings
+from ...utils import HashRing
+
+
+# [Blob GC] What can still read a stream entry, in ONE round trip
+# KEYS[1] = stream. Returns {first entry id ('' if empty), group bound, inclusive, ...}
+# - group without pending entries: everything <= last-delivered-id is consumed (inclusive = 1)
+# - group with pending entries: everything < its oldest pending id is consumed (inclusive = 0)
+BLOB_GC_LUA = """
+local first = redis.call('XRANGE', KEYS[1], '-', '+', 'COUNT', 1)
+if #first == 0 then return {''} end
+local result = {first[1][1]}
+for _, group in ipairs(redis.call('XINFO', 'GROUPS', KEYS[1])) do
+    local info = {}
+    for i = 1, #group, 2 do info[group[i]] = group[i + 1] end
+    if tonumber(info['pending']) > 0 then
+        result[#result + 1] = redis.call('XPENDING', KEYS[1], info['name'])[2]
+        result[#result + 1] = 0
+    else
+        result[#result + 1] = info['last-delivered-id']
+        result[#result + 1] = 1
+    end
+end
+return result
+"""
+
+_GC_INTERVAL = 0.2  # Per-topic blob GC period (seconds, earlier when over the byte budget)
+_KEEP_LATEST = 2    # Newest blobs always kept for REALTIME readers (pop_latest never acks)
+_CLAIM_INTERVAL = 30.0  # DURABLE pop: how often idle pending entries are reclaimed (seconds, first read always)
+
+
+def _stream_id(entry_id):
+    """b'1700000000000-3' -> (1700000000000, 3) for ordering"""
+    ms, _, seq = (entry_id.decode() if isinstance(entry_id, bytes) else entry_id).partition('-')
+    return int(ms), int(seq or 0)
+
+
+def _parse_hosts(hosts, default_port):
+    """'h1:6380,h2' / ['h1:6380', ('h2', 6380)] -> [(host, port), ...]"""
+    if isinstance(hosts, str):
+        hosts = [h for h in hosts.split(',') if h.strip()]
+    parsed = []
+    for entry in hosts or ():
+        if isinstance(entry, str):
+            host, _, port = entry.strip().rpartition(':') if ':' in entry else (entry.strip(), '', '')
+            entry = (host, int(port) if port else default_port)
+        parsed.append((entry[0], int(entry[1])))
+    return parsed
 
 
 class DualRedisBroker(BrokerInterface):
@@ -18,22 +72,80 @@ class DualRedisBroker(BrokerInterface):
     Dual Redis Stream Broker:
     - ctrl_redis: Lightweight stream (message IDs)
     - data_redis: Heavy data storage (actual frames)
+    - Blob key: {topic}:data:{epoch}:{frame_id} (read from the fixed frame header)
+    - Packets smaller than inline_threshold go inline in the stream entry (no blob, one command)
+    - Blob lifetime: the producer frees a blob once its entry is trimmed from the stream or
+      acknowledged by every consumer group, or when the topic exceeds max_topic_bytes
+      (blob_ttl is only a safety net for blobs whose producer died)
+    - content_addressed: the payload is stored once under {topic}:data:blob:{owner}:{hash} and shared by
+      every entry with the same bytes (the frame head stays in the entry); an unchanged payload
+      is not uploaded again, only its TTL is refreshed. owner = this broker instance in this process:
+      its blobs are referenced only by its own entries, so the local reference count is exact
+      (several producers on one topic, e.g. replicas, never free each other's blobs)
+    - data_hosts: sharded data plane -> each topic's blobs live on one data Redis chosen by
+      consistent hashing (adding a shard moves ~1/N topics; one stream never spans shards)
+    - claim_idle: DURABLE entries pending this long (seconds) without ACK are taken over by another
+      consumer of the group (its owner is assumed dead). A live consumer that holds a batch longer
+      (prefetch x slowest loop) loses it too and the entries are processed twice, so keep it well
+      above that; None/0 disables reclaiming (a crashed consumer's batch then stays pending)
     """
     
     
     def __init__(self, ctrl_host=None, ctrl_port=None, 
-                       data_host=None, data_port=None, maxlen=100):
+                       data_host=None, data_port=None, maxlen=100, prefetch=8,
+                       write_queue_size=64, stats_ttl=0.5, inline_threshold=8192,
+                       blob_ttl=60, max_topic_bytes=None, content_addressed=False,
+                       data_hosts=None, claim_idle=30.0):
         
         ctrl_host = ctrl_host or settings.REDIS_HOST
         ctrl_port = ctrl_port or settings.REDIS_PORT
         data_host = data_host or settings.DATA_REDIS_HOST
         data_port = data_port or settings.DATA_REDIS_PORT
+        data_hosts = _parse_hosts(data_hosts or settings.DATA_REDIS_HOSTS, data_port)
 
         self.maxlen = maxlen
+        self.prefetch = max(1, prefetch)  # DURABLE pop: entries fetched per XREADGROUP
+        self.write_queue_size = write_queue_size  # Write-behind queue bound (separate instances only)
+        self.inline_threshold = inline_threshold  # Packets below this size are stored in the stream entry (0: never)
+        self.blob_ttl = blob_ttl  # Safety TTL (seconds) for blobs never collected
+        self.max_topic_bytes = max_topic_bytes  # Per-topic blob byte budget (None: unlimited)
+        self.content_addressed = content_addressed  # Dedup payloads by hash (static scenes)
+        self.claim_idle = claim_idle  # DURABLE: idle seconds before XAUTOCLAIM (None/0: never)
         self.ctrl_redis = redis.Redis(host=ctrl_host, port=ctrl_port)
-        self.data_redis = self._connect_data_redis(data_host, data_port, ctrl_port)
+        # [Sharding] "host:port" -> client; data_redis = first shard (single instance: the only one)
+        self._data_nodes = {f"{host}:{port}": self._connect_data_redis(host, port, ctrl_port)
+                            for host, port in data_hosts}
+        self._ring = HashRing(self._data_nodes) if len(self._data_nodes) > 1 else None
+        if self._data_nodes:
+            self.data_redis = next(iter(self._data_nodes.values()))
+        else:
+            self.data_redis = self._connect_data_redis(data_host, data_port, ctrl_port)
         self._consumer_groups = set()
         self._topic_last_id = {}  # Track last seen ID per topic for deduplication
+        self._latest_script = self.ctrl_redis.register_script(LATEST_ENTRY_LUA)
+        self._stats_script = self.ctrl_redis.register_script(QUEUE_STATS_LUA)
+        self._stats_cache = QueueStatsCache(stats_ttl)
+        self._known_topics = set()  # Topics already in the registry (first push registers)
+        self._topic_limits = {}  # topic -> (maxlen, approximate) applied inside XADD
+        self._prefetched = {}    # (topic, group, consumer) -> deque of blobs
+        self._pending_acks = {}  # (topic, group) -> msg ids to ack with the next read
+        self._next_claim = {}    # (topic, group, consumer) -> monotonic time of the next XAUTOCLAIM
+        self._write_queue = None  # Write-behind: started lazily on first push
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._actrl = None  # redis.asyncio clients (created on first async call)
+        self._adata = None
+        self._adata_nodes = {}
+        self._alatest_script = None
+        self._gc_script = self.ctrl_redis.register_script(BLOB_GC_LUA)
+        self._agc_script = None
+        self._blobs = {}       # topic -> deque of (entry id, blob key) written by this producer
+        self._blob_refs = {}   # blob key -> [entries referencing it, size]
+        self._owner = None     # Content-addressed key owner (see _blob_owner)
+        self._owner_pid = None
+        self._blob_bytes = {}  # topic -> bytes of tracked blobs (each blob counted once)
+        self._next_gc = {}     # topic -> monotonic time of the next collection
+        self._gc_lock = threading.Lock()
 
     def reset(self):
         """
@@ -41,10 +153,21 @@ class DualRedisBroker(BrokerInterface):
         - Called ONLY by the main system process on startup
         """
         try:
+            self.flush(timeout=1.0)
             self.ctrl_redis.flushall()
-            if self.ctrl_redis != self.data_redis:
-                self.data_redis.flushall()
+            for data in self._data_clients():
+                if self.ctrl_redis != data:
+                    data.flushall()
             self._topic_last_id.clear()
+            self._known_topics.clear()
+            self._stats_cache.clear()
+            with self._gc_lock:
+                self._blobs.clear()
+                self._blob_refs.clear()
+                self._blob_bytes.clear()
+            self._prefetched.clear()
+            self._pending_acks.clear()
+            self._next_claim.clear()
             print("🧹 [DualRedis] System Reset: FLUSHALL executed")
         except Exception as e:
             print(f"⚠️ [DualRedis] Failed to reset: {e}")
@@ -63,6 +186,15 @@ class DualRedisBroker(BrokerInterface):
             print(f"🔄 [DualRedis] Falling back to Control Redis port ({fallback_port}) for local testing.")
             return redis.Redis(host=host, port=fallback_port)
 
+    def _data(self, topic):
+        """Data Redis holding the topic's blobs (consistent hash over data_hosts)"""
+        if self._ring is None:
+            return self.data_redis
+        return self._data_nodes[self._ring.get(topic)]
+
+    def _data_clients(self):
+        return list(self._data_nodes.values()) or [self.data_redis]
+
     def _ensure_consumer_group(self, stream: str, group: str):
         """Create consumer group if not exists"""
         key = f"{stream}:{group}"
@@ -83,111 +215,412 @@ class DualRedisBroker(BrokerInterface):
         """
         Store data in Data Redis, push ID to Control Redis Stream
         """
-        if len(frame_bytes) < 4:
+        self.push_buffers(topic, [frame_bytes])
+
+    def push_buffers(self, topic, buffers):
+        """
+        Multi-part push (Frame.to_buffers): SET head + APPEND each payload part
+        - Parts go to redis-py as-is (large buffers are written to the socket separately),
+          so the frame is only assembled inside Redis, never in Python
+        - Small packets (< inline_threshold): one XADD carrying the packet, no blob
+        - content_addressed: payload already stored -> only EXPIRE (no re-upload)
+        """
+        plan = self._plan_push(topic, buffers)
+        if plan is None:
             return
+        fields, data_key, buffers, upload = plan
+        if topic not in self._known_topics:
+            self._register_topic(topic)
 
-        # Extract frame_id from header
-        frame_id = struct.unpack('!I', frame_bytes[:4])[0]
-        data_key = f"{topic}:data:{frame_id}"
-        
         # Optimization: If Ctrl and Data are same instance, use single pipeline
-        if self.ctrl_redis == self.data_redis:
+        if self.ctrl_redis == self._data(topic):
+            if data_key is None:
+                self._queue_entry(self.ctrl_redis, topic, fields)
+                return
             pipe = self.ctrl_redis.pipeline()
-            pipe.set(data_key, frame_bytes, ex=60)
-            pipe.xadd(topic, {'frame_id': str(frame_id)}, maxlen=self.maxlen, approximate=True)
-            pipe.execute()
+            self._queue_write(pipe, data_key, buffers, upload)
+            self._queue_entry(pipe, topic, fields)
+            entry_id = pipe.execute()[-1]
+            self._track_blob(topic, entry_id, data_key)
+            self._collect_blobs((topic,))
         else:
-            # Separate instances: Push Data (Async-like) then Ctrl
-            # Note: We can't pipeline across different connections.
-            # But we can pipeline Data push to reduce RTT if multiple ops were needed.
-            # For now, we perform sequential ops.
-            # TODO: Make data push async?
-            self.data_redis.set(data_key, frame_bytes, ex=60)
-            self.ctrl_redis.xadd(topic, {'frame_id': str(frame_id)}, maxlen=self.maxlen, approximate=True)
+            # Separate instances: Write-behind (push returns after enqueue)
+            # Writer thread stores blobs first, then XADDs -> an entry is never visible before its blob
+            # Writable views (e.g. raw ndarray memory) are copied: the caller may reuse the array
+            # Inline entries take the same queue -> stream order is kept on mixed topics
+            if upload:
+                buffers = [bytes(buf) if isinstance(buf, memoryview) and not buf.readonly else buf
+                           for buf in buffers]
+            self._ensure_writer()
+            self._write_queue.put((topic, data_key, fields, buffers, upload))
+
+    def _ensure_writer(self):
+        """[Internal] Start the write-behind thread in this process (lazy, fork-safe)"""
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._write_queue = queue.Queue(maxsize=self.write_queue_size)
+                self._writer = threading.Thread(target=self._write_loop, name="DualRedisWriter", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush, 2.0)
+
+    def _write_loop(self):
+        """[Internal] Drain queued pushes in batches: pipelined blob writes (one pipeline per shard) -> pipelined XADDs"""
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < self.write_queue_size:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                pipes = {}
+                for topic, data_key, _, buffers, upload in batch:
+                    if data_key is not None:
+                        data = self._data(topic)
+                        pipe = pipes.get(data)
+                        if pipe is None:
+                            pipe = pipes[data] = data.pipeline(transaction=False)
+                        self._queue_write(pipe, data_key, buffers, upload)
+                for pipe in pipes.values():
+                    pipe.execute()
+
+                pipe = self.ctrl_redis.pipeline(transaction=False)
+                for topic, _, fields, _, _ in batch:
+                    self._queue_entry(pipe, topic, fields)
+                entry_ids = pipe.execute()
+
+                for (topic, data_key, *_), entry_id in zip(batch, entry_ids):
+                    if data_key is not None:
+                        self._track_blob(topic, entry_id, data_key)
+                self._collect_blobs({topic for topic, *_ in batch})
+            except Exception as e:
+                print(f"DualRedis Write Error: {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    def flush(self, timeout=None):
+        """Wait until queued write-behind pushes are stored (True if drained)"""
+        q = self._write_queue
+        if q is None:
+            return True
+        deadline = None if timeout is None else time.time() + timeout
+        with q.all_tasks_done:
+            while q.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                q.all_tasks_done.wait(remaining)
+        return True
+
+    def register_topic(self, topic, maxlen, approximate=True):
+        """Set the topic's stream limit once; every later XADD applies it (no per-frame XTRIM)"""
+        self._topic_limits[topic] = (maxlen, approximate)
+        try:
+            self.ctrl_redis.hset(TOPICS_KEY, topic, maxlen)
+            self._known_topics.add(topic)
+        except Exception as e:
+            print(f"DualRedis Register Error: {e}")
+
+    def _queue_entry(self, pipe, topic, fields):
+        """[Internal] XADD the stream entry ({'frame_key'} or inline {'data'}) with the topic's registered limit"""
+        maxlen, approximate = self._topic_limits.get(topic, (self.maxlen, True))
+        return pipe.xadd(topic, fields, maxlen=maxlen, approximate=approximate)
+
+    def _register_topic(self, topic):
+        """Add the topic to the stats registry once (keeps an existing limit)"""
+        try:
+            self.ctrl_redis.hsetnx(TOPICS_KEY, topic, self._topic_limits.get(topic, (self.maxlen,))[0])
+            self._known_topics.add(topic)
+        except Exception as e:
+            print(f"DualRedis Register Error: {e}")
+
+    @staticmethod
+    def _blob_keys(topic, head):
+        """(frame_key, data_key) from the fixed frame header, None if not a frame"""
+        header = Frame.peek_header(head)
+        if header is None:
+            return None
+        # (epoch, frame_id) -> unique across producer restarts
+        frame_key = f"{header.epoch}:{header.frame_id}"
+        return frame_key, f"{topic}:data:{frame_key}"
+
+    def _plan_push(self, topic, buffers):
+        """
+        [Internal] (entry fields, blob key, blob buffers, upload needed) for a packet, None if not a frame
+        - inline: blob key None
+        - content-addressed: entry = {'frame_key': 'blob:{owner}:{hash}', 'head': frame head}, blob = payload only
+        """
+        keys = self._blob_keys(topic, buffers[0])
+        if keys is None:
+            return None
+        frame_key, data_key = keys
+        if sum(len(buf) for buf in buffers) < self.inline_threshold:
+            # [Inline] 작은 패킷 (텔레메트리 / 메타 전용)은 스트림 엔트리에 직접 저장
+            return {'data': b''.join(buffers)}, None, None, False
+
+        fields = {'frame_key': frame_key}
+        head, payload = self._split_payload(buffers) if self.content_addressed else (None, None)
+        if payload:
+            # [Dedup] 헤더(frame_id / timestamp)는 매 프레임 다름 -> payload만 해시
+            digest = hashlib.blake2b(digest_size=16)
+            for part in payload:
+                digest.update(part)
+            fields = {'frame_key': f"blob:{self._blob_owner()}:{digest.hexdigest()}", 'head': head}
+            data_key, buffers = f"{topic}:data:{fields['frame_key']}", payload
+        upload = self._acquire_blob(topic, data_key, sum(len(buf) for buf in buffers))
+        return fields, data_key, buffers, upload
+
+    def _blob_owner(self):
+        """Random id of this broker instance in this process (renewed after fork: the child tracks its own refs)"""
+        if self._owner_pid != os.getpid():
+            self._owner_pid = os.getpid()
+            self._owner = os.urandom(4).hex()
+            with self._gc_lock:
+                self._blobs.clear()
+                self._blob_refs.clear()
+                self._blob_bytes.clear()
+        return self._owner
+
+    @staticmethod
+    def _split_payload(buffers):
+        """(frame head bytes, payload parts): to_buffers() already splits, push() bytes are cut after meta"""
+        if len(buffers) > 1:
+            return bytes(buffers[0]), [buf for buf in buffers[1:] if len(buf)]
+        raw = buffers[0]
+        header = Frame.peek_header(raw)
+        offset = header.body_offset + 8 * bin(header.trace_mask).count('1') + header.meta_len
+        return bytes(raw[:offset]), [raw[offset:]] if len(raw) > offset else []
+
+    def _queue_blob(self, pipe, data_key, buffers):
+        """Queue SET + APPENDs for a multi-part blob (APPEND keeps the TTL set by SET)"""
+        pipe.set(data_key, buffers[0], ex=self.blob_ttl)
+        for part in buffers[1:]:
+            if len(part):
+                pipe.append(data_key, part)
+
+    def _queue_write(self, pipe, data_key, buffers, upload):
+        """Upload the blob, or only refresh the TTL of a content-addressed blob already stored"""
+        if upload:
+            self._queue_blob(pipe, data_key, buffers)
+        else:
+            pipe.expire(data_key, self.blob_ttl)
+
+    # ========== Blob Lifetime (producer side) ==========
+
+    def _acquire_blob(self, topic, data_key, size):
+        """Reference a blob before its entry is written (True: not stored yet -> upload it)"""
+        with self._gc_lock:
+            ref = self._blob_refs.get(data_key)
+            if ref is not None:
+                ref[0] += 1
+                return False
+            self._blob_refs[data_key] = [1, size]
+            self._blob_bytes[topic] = self._blob_bytes.get(topic, 0) + size
+            return True
+
+    def _track_blob(self, topic, entry_id, data_key):
+        with self._gc_lock:
+            self._blobs.setdefault(topic, deque()).append((_stream_id(entry_id), data_key))
+
+    def _gc_due(self, topic, now):
+        over_budget = self.max_topic_bytes and self._blob_bytes.get(topic, 0) > self.max_topic_bytes
+        return over_budget or now >= self._next_gc.get(topic, 0)
+
+    def _collectable(self, topic, reply):
+        """
+        [Internal] Blob keys that can no longer be read (oldest first, newest _KEEP_LATEST kept)
+        - trimmed from the stream, or consumed by every group, or over the byte budget
+        - no consumer group yet: kept until trimmed (a late DURABLE group starts from the oldest entry)
+        - shared (content-addressed) blobs are freed with their last referencing entry
+        """
+        first = _stream_id(reply[0]) if reply and reply[0] else None
+        bounds = [(_stream_id(reply[i]), reply[i + 1]) for i in range(1, len(reply or ()), 2)]
+        keys = []
+        with self._gc_lock:
+            blobs = self._blobs.get(topic, ())
+            while len(blobs) > _KEEP_LATEST:
+                entry_id, data_key = blobs[0]
+                trimmed = first is None or entry_id < first
+                consumed = bool(bounds) and all(entry_id <= bound if inclusive else entry_id < bound
+                                                for bound, inclusive in bounds)
+                over_budget = self.max_topic_bytes and self._blob_bytes[topic] > self.max_topic_bytes
+                if not (trimmed or consumed or over_budget):
+                    break  # 이후 엔트리는 더 최신 -> 모두 아직 읽힐 수 있음
+                blobs.popleft()
+                ref = self._blob_refs.get(data_key)
+                if ref is None:
+                    continue
+                ref[0] -= 1
+                if ref[0] <= 0:
+                    del self._blob_refs[data_key]
+                    self._blob_bytes[topic] -= ref[1]
+                    keys.append(data_key)
+        return keys
+
+    def _collect_blobs(self, topics):
+        """[Internal] Free unreadable blobs of the given topics (throttled: 1 script + 1 UNLINK)"""
+        now = time.monotonic()
+        for topic in topics:
+            if not self._gc_due(topic, now):
+                continue
+            self._next_gc[topic] = now + _GC_INTERVAL
+            try:
+                keys = self._collectable(topic, self._gc_script(keys=[topic]))
+                if keys:
+                    self._data(topic).unlink(*keys)
+            except Exception as e:
+                print(f"DualRedis GC Error: {e}")
+
+    async def _acollect_blobs(self, topic):
+        now = time.monotonic()
+        if not self._gc_due(topic, now):
+            return
+        self._next_gc[topic] = now + _GC_INTERVAL
+        actrl, adata = self._ensure_async(topic)
+        try:
+            keys = self._collectable(topic, await self._agc_script(keys=[topic]))
+            if keys:
+                await adata.unlink(*keys)
+        except Exception as e:
+            print(f"DualRedis GC Error: {e}")
 
     def pop(self, topic, timeout=1, group="default", consumer="worker"):
         """
-        Read frame_id from stream, fetch data from Data Redis
+        Read frame_key from stream, fetch data from Data Redis
+        - Reads up to `prefetch` entries per XREADGROUP into a local buffer
+        - Blobs for the whole batch are fetched with one MGET
+        - ACKs are deferred and sent in bulk, pipelined with the next XREADGROUP
+          (an entry is acked only after it was handed out -> crash leaves it pending)
+        - Pending entries idle for claim_idle (crashed / rescheduled consumer) are reclaimed
+          with XAUTOCLAIM on the first read and every _CLAIM_INTERVAL, before new entries
         """
+        buffer = self._prefetched.setdefault((topic, group, consumer), deque())
+        if not buffer:
+            self._fill_prefetch(buffer, topic, timeout, group, consumer)
+        return buffer.popleft() if buffer else None
+
+    def _fill_prefetch(self, buffer, topic, timeout, group, consumer):
+        """[Internal] ACK previous batch + XREADGROUP (1 round trip) -> MGET blobs (1 round trip)"""
         self._ensure_consumer_group(topic, group)
         
         try:
-            result = self.ctrl_redis.xreadgroup(
-                groupname=group,
-                consumername=consumer,
-                streams={topic: '>'},
-                count=1,
-                block=int(timeout * 1000)
-            )
-            
-            if not result:
-                return None
-            
-            stream_name, messages = result[0]
+            pipe = self.ctrl_redis.pipeline(transaction=False)
+            acks = self._pending_acks.pop((topic, group), None)
+            if acks:
+                pipe.xack(topic, group, *acks)
+            messages = None
+            if self._claim_due(topic, group, consumer):
+                pipe.xautoclaim(topic, group, consumer, int(self.claim_idle * 1000), count=self.prefetch)
+                messages = self._claimed(topic, group, pipe.execute()[-1])
+                pipe = self.ctrl_redis.pipeline(transaction=False)
+
             if not messages:
-                return None
-            
-            msg_id, fields = messages[0]
-            frame_id = fields.get(b'frame_id', b'').decode('utf-8')
-            
-            # Acknowledge message
-            self.ctrl_redis.xack(topic, group, msg_id)
-            
-            # Fetch actual data
-            data_key = f"{topic}:data:{frame_id}"
-            raw_data = self.data_redis.get(data_key)
+                pipe.xreadgroup(
+                    groupname=group,
+                    consumername=consumer,
+                    streams={topic: '>'},
+                    count=self.prefetch,
+                    block=int(timeout * 1000)
+                )
+                result = pipe.execute()[-1]
+
+                if not result:
+                    return
+
+                stream_name, messages = result[0]
+                if not messages:
+                    return
+
+                # Acknowledged together with the next read
+                self._pending_acks.setdefault((topic, group), []).extend(msg_id for msg_id, _ in messages)
             
-            if raw_data:
-                return raw_data
-            else:
-                # Data expired or missing
-                return None
+            # Fetch actual data for the whole batch (inline entries need no fetch)
+            keys = self._entry_data_keys(topic, messages)
+            buffer.extend(self._merge_entries(messages, self._data(topic).mget(keys) if keys else []))
                 
         except Exception as e:
             print(f"DualRedis Pop Error: {e}")
-            return None
+
+    def _claim_due(self, topic, group, consumer):
+        if not self.claim_idle:
+            return False
+        now = time.monotonic()
+        key = (topic, group, consumer)
+        if now < self._next_claim.get(key, 0):
+            return False
+        self._next_claim[key] = now + min(_CLAIM_INTERVAL, self.claim_idle)
+        return True
+
+    def _claimed(self, topic, group, reply):
+        """
+        [Recovery] XAUTOCLAIM reply -> entries to hand out again (their ACK is deferred like a normal batch)
+        - Entries trimmed while pending come back without fields (Redis 6.2): acked, not delivered
+        """
+        claimed = reply[1] if reply else []
+        if claimed:
+            self._pending_acks[(topic, group)] = [msg_id for msg_id, _ in claimed]
+            print(f"♻️ [DualRedis] Reclaimed {len(claimed)} pending entries on '{topic}' ({group})")
+        return [(msg_id, fields) for msg_id, fields in claimed if fields]
+
+    @staticmethod
+    def _entry_data_keys(topic, messages):
+        """Blob keys of entries stored on the data plane (inline entries carry their packet)"""
+        return [f"{topic}:data:{fields.get(b'frame_key', b'').decode('utf-8')}"
+                for _, fields in messages if b'data' not in fields]
+
+    @staticmethod
+    def _merge_entries(messages, blobs):
+        """Packets in stream order: inline data or the fetched blob (expired or missing -> skipped)"""
+        blobs = iter(blobs)
+        for _, fields in messages:
+            raw = fields.get(b'data')
+            if raw is None:
+                raw = next(blobs)
+                if raw and b'head' in fields:
+                    raw = fields[b'head'] + raw  # [Content-addressed] 엔트리의 헤더 + 공유 payload
+            if raw:
+                yield raw
 
     def pop_latest(self, topic, timeout=1):
         """
         Read the LATEST UNIQUE message (REALTIME mode).
         - Dedplicates frames: Returns None if no NEW frame exists
-        - Efficient waiting: Blocks until new data arrives
+        - Same instance: tip check + blob GET in ONE round trip (Lua)
+        - Separate instances: one round trip to each Redis
+        - Efficient waiting: XREAD blocks from the last seen id until new data arrives
         """
         try:
-            start_time = time.time()
-            
+            data = self._data(topic)
+            same_instance = self.ctrl_redis == data
+            blob_prefix = f"{topic}:data:" if same_instance else ''
+            deadline = time.time() + timeout
+
             while True:
-                # 1. Get current tip
-                entries = self.ctrl_redis.xrevrange(topic, count=1)
-                
-                if entries:
-                    msg_id, fields = entries[0]
-                    last_seen = self._topic_last_id.get(topic)
-                    
-                    if msg_id != last_seen:
-                        # New frame found!
-                        self._topic_last_id[topic] = msg_id
-                        frame_id = fields.get(b'frame_id', b'').decode('utf-8')
-                        data_key = f"{topic}:data:{frame_id}"
-                        raw_data = self.data_redis.get(data_key)
-                        return raw_data if raw_data else None
-                
-                # Check timeout
-                elapsed = time.time() - start_time
-                remaining = timeout - elapsed
+                last_seen = self._topic_last_id.get(topic)
+                result = self._latest_script(keys=[topic], args=[last_seen or '', 'frame_key', blob_prefix, 'data', 'head'])
+                if result and len(result) >= 2:
+                    msg_id, value = result[0], result[1]
+                    self._topic_last_id[topic] = msg_id
+                    if not value:
+                        return None
+                    if not same_instance and len(result) != 3:  # GET not done by the script / not inline
+                        value = data.get(f"{topic}:data:{value.decode('utf-8')}")
+                    if len(result) == 4 and value:  # content-addressed: head + shared payload
+                        value = result[3] + value
+                    return value
+
+                remaining = deadline - time.time()
                 if remaining <= 0:
                     return None
-                
-                # 2. Wait for NEW data using XREAD with '$' (special ID for "new items only")
-                # This blocks efficiently until something is added.
-                try:
-                    block_ms = int(remaining * 1000)
-                    self.ctrl_redis.xread({topic: '$'}, count=1, block=block_ms)
-                except redis.exceptions.ResponseError:
-                    # Stream might not exist yet
-                    time.sleep(0.1)
-                
-                # Loop continues -> xrevrange again to get the absolute latest
+
+                # Block from the last seen id (not '$' -> no frame lost between the script and XREAD)
+                # On wake-up, loop once more: the script returns the newest entry + blob together
+                if not self.ctrl_redis.xread({topic: last_seen or '0-0'}, count=1, block=max(1, int(remaining * 1000))):
+                    return None
                 
         except Exception as e:
             print(f"DualRedis PopLatest Error: {e}")
@@ -197,7 +630,8 @@ class DualRedisBroker(BrokerInterface):
         """Trim stream (for backward compatibility)"""
         try:
             self.ctrl_redis.xtrim(topic, maxlen=size, approximate=True)
-            self.ctrl_redis.set(f"edgeflow:meta:limit:{topic}", size)
+            self.ctrl_redis.hset(TOPICS_KEY, topic, size)
+            self._known_topics.add(topic)
         except Exception:
             pass
 
@@ -209,23 +643,168 @@ class DualRedisBroker(BrokerInterface):
             return 0
 
     def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
-        """Return stats for all tracked streams"""
-        stats = {}
+        """Return stats for all registered streams (one scripted round trip, cached for stats_ttl)"""
+        stats = self._stats_cache.get()
+        if stats is not None:
+            return stats
         try:
-            meta_keys = self.ctrl_redis.keys("edgeflow:meta:limit:*")
-            
-            for key in meta_keys:
-                key_str = key.decode('utf-8')
-                topic = key_str.replace("edgeflow:meta:limit:", "")
+            return self._stats_cache.put(parse_queue_stats(self._stats_script(keys=[TOPICS_KEY]), self.maxlen))
+        except Exception as e:
+            print(f"DualRedis Stats Error: {e}")
+            return {}
+
+    # ========== Async API (redis.asyncio) ==========
+
+    def _ensure_async(self, topic=None):
+        """Async clients mirroring ctrl/data connections (same instance -> one client) -> (ctrl, topic's data)"""
+        if self._actrl is None:
+            ctrl_kwargs = self.ctrl_redis.connection_pool.connection_kwargs
+            self._actrl = aioredis.Redis(host=ctrl_kwargs.get('host'), port=ctrl_kwargs.get('port'))
+            for name, data in self._data_nodes.items() or [(None, self.data_redis)]:
+                if self.ctrl_redis == data:
+                    self._adata_nodes[name] = self._actrl
+                else:
+                    data_kwargs = data.connection_pool.connection_kwargs
+                    self._adata_nodes[name] = aioredis.Redis(host=data_kwargs.get('host'), port=data_kwargs.get('port'))
+            self._adata = next(iter(self._adata_nodes.values()))
+            self._alatest_script = self._actrl.register_script(LATEST_ENTRY_LUA)
+            self._astats_script = self._actrl.register_script(QUEUE_STATS_LUA)
+            self._agc_script = self._actrl.register_script(BLOB_GC_LUA)
+        if topic is None or self._ring is None:
+            return self._actrl, self._adata
+        return self._actrl, self._adata_nodes[self._ring.get(topic)]
+
+    async def apush(self, topic, frame_bytes):
+        await self.apush_buffers(topic, [frame_bytes])
+
+    async def apush_buffers(self, topic, buffers):
+        """Blob first, then stream entry (separate instances: two awaits, never blocks the loop)"""
+        plan = self._plan_push(topic, buffers)
+        if plan is None:
+            return
+        fields, data_key, buffers, upload = plan
+        actrl, adata = self._ensure_async(topic)
+
+        try:
+            if topic not in self._known_topics:
+                await actrl.hsetnx(TOPICS_KEY, topic, self._topic_limits.get(topic, (self.maxlen,))[0])
+                self._known_topics.add(topic)
+            if data_key is None:
+                await self._queue_entry(actrl, topic, fields)
+                return
+            if actrl is adata:
+                pipe = actrl.pipeline()
+                self._queue_write(pipe, data_key, buffers, upload)
+                self._queue_entry(pipe, topic, fields)
+                entry_id = (await pipe.execute())[-1]
+            else:
+                pipe = adata.pipeline(transaction=False)
+                self._queue_write(pipe, data_key, buffers, upload)
+                await pipe.execute()
+                entry_id = await self._queue_entry(actrl, topic, fields)
+            self._track_blob(topic, entry_id, data_key)
+            await self._acollect_blobs(topic)
+        except Exception as e:
+            print(f"DualRedis Push Error: {e}")
+
+    async def apop(self, topic, timeout=1, group="default", consumer="worker"):
+        """Async pop sharing the prefetch buffer / deferred ACKs of pop()"""
+        buffer = self._prefetched.setdefault((topic, group, consumer), deque())
+        if not buffer:
+            await self._afill_prefetch(buffer, topic, timeout, group, consumer)
+        return buffer.popleft() if buffer else None
+
+    async def _afill_prefetch(self, buffer, topic, timeout, group, consumer):
+        actrl, adata = self._ensure_async(topic)
+        try:
+            key = f"{topic}:{group}"
+            if key not in self._consumer_groups:
+                try:
+                    await actrl.xgroup_create(topic, group, id='0', mkstream=True)
+                except redis.exceptions.ResponseError as e:
+                    if "BUSYGROUP" not in str(e):
+                        raise
+                self._consumer_groups.add(key)
+
+            pipe = actrl.pipeline(transaction=False)
+            acks = self._pending_acks.pop((topic, group), None)
+            if acks:
+                pipe.xack(topic, group, *acks)
+            messages = None
+            if self._claim_due(topic, group, consumer):
+                pipe.xautoclaim(topic, group, consumer, int(self.claim_idle * 1000), count=self.prefetch)
+                messages = self._claimed(topic, group, (await pipe.execute())[-1])
+                pipe = actrl.pipeline(transaction=False)
+
+            if not messages:
+                pipe.xreadgroup(
+                    groupname=group,
+                    consumername=consumer,
+                    streams={topic: '>'},
+                    count=self.prefetch,
+                    block=int(timeout * 1000)
+                )
+                result = (await pipe.execute())[-1]
+                if not result or not result[0][1]:
+                    return
+
+                messages = result[0][1]
+                self._pending_acks.setdefault((topic, group), []).extend(msg_id for msg_id, _ in messages)
+            keys = self._entry_data_keys(topic, messages)
+            buffer.extend(self._merge_entries(messages, await adata.mget(keys) if keys else []))
                 
-                limit_bytes = self.ctrl_redis.get(key)
-                limit = int(limit_bytes) if limit_bytes else self.maxlen
-                current = self.ctrl_redis.xlen(topic)
+        except Exception as e:
+            print(f"DualRedis Pop Error: {e}")
+
+    async def apop_latest(self, topic, timeout=1):
+        actrl, adata = self._ensure_async(topic)
+        try:
+            same_instance = actrl is adata
+            blob_prefix = f"{topic}:data:" if same_instance else ''
+            deadline = time.time() + timeout
+
+            while True:
+                last_seen = self._topic_last_id.get(topic)
+                result = await self._alatest_script(keys=[topic], args=[last_seen or '', 'frame_key', blob_prefix, 'data', 'head'])
+                if result and len(result) >= 2:
+                    msg_id, value = result[0], result[1]
+                    self._topic_last_id[topic] = msg_id
+                    if not value:
+                        return None
+                    if not same_instance and len(result) != 3:
+                        value = await adata.get(f"{topic}:data:{value.decode('utf-8')}")
+                    if len(result) == 4 and value:
+                        value = result[3] + value
+                    return value
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                if not await actrl.xread({topic: last_seen or '0-0'}, count=1, block=max(1, int(remaining * 1000))):
+                    return None
                 
-                stats[topic] = {"current": current, "max": limit}
+        except Exception as e:
+            print(f"DualRedis PopLatest Error: {e}")
+            return None
+
+    async def aqueue_size(self, topic: str) -> int:
+        try:
+            return await self._ensure_async()[0].xlen(topic)
+        except Exception:
+            return 0
+
+    async def aget_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Same as get_queue_stats (shares its cache)"""
+        stats = self._stats_cache.get()
+        if stats is not None:
+            return stats
+        self._ensure_async()
+        try:
+            reply = await self._astats_script(keys=[TOPICS_KEY])
+            return self._stats_cache.put(parse_queue_stats(reply, self.maxlen))
         except Exception as e:
             print(f"DualRedis Stats Error: {e}")
-        return stats
+            return {}
 
     # ========== Serialization Protocol ==========
     
@@ -236,7 +815,16 @@ class DualRedisBroker(BrokerInterface):
             "ctrl_port": self.ctrl_redis.connection_pool.connection_kwargs.get('port'),
             "data_host": self.data_redis.connection_pool.connection_kwargs.get('host'),
             "data_port": self.data_redis.connection_pool.connection_kwargs.get('port'),
-            "maxlen": self.maxlen
+            "maxlen": self.maxlen,
+            "prefetch": self.prefetch,
+            "write_queue_size": self.write_queue_size,
+            "stats_ttl": self._stats_cache.ttl,
+            "inline_threshold": self.inline_threshold,
+            "blob_ttl": self.blob_ttl,
+            "max_topic_bytes": self.max_topic_bytes,
+            "content_addressed": self.content_addressed,
+            "data_hosts": list(self._data_nodes) or None,
+            "claim_idle": self.claim_idle
         }
     
     @classmethod
@@ -246,5 +834,14 @@ class DualRedisBroker(BrokerInterface):
             ctrl_port=config.get("ctrl_port"),
             data_host=config.get("data_host"),
             data_port=config.get("data_port"),
-            maxlen=config.get("maxlen", 100)
+            maxlen=config.get("maxlen", 100),
+            prefetch=config.get("prefetch", 8),
+            write_queue_size=config.get("write_queue_size", 64),
+            stats_ttl=config.get("stats_ttl", 0.5),
+            inline_threshold=config.get("inline_threshold", 8192),
+            blob_ttl=config.get("blob_ttl", 60),
+            max_topic_bytes=config.get("max_topic_bytes"),
+            content_addressed=config.get("content_addressed", False),
+            data_hosts=config.get("data_hosts"),
+            claim_idle=config.get("claim_idle", 30.0)
         )
\ No newline at end of file
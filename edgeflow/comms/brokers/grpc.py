@@ -1,62 +1,415 @@
-# edgeflow/comms/grpc.py
+# edgeflow/comms/brokers/grpc.py
+"""
+gRPC Streaming Broker (point-to-point alternative to Redis)
+- Server: per-topic bounded streams + consumer groups (in-memory, see MemoryBroker)
+- Client: ONE channel per broker, ONE long-lived bidirectional stream per topic and direction
+- Service "edgeflow.Broker" is defined with generic handlers and raw bytes messages
+  (frames are already serialized packets -> no protobuf codegen / extra copy)
+
+Run the server:  python -m edgeflow.comms.brokers.grpc --port 50051
+"""
+import argparse
+import json
 import queue
 import threading
+import time
+from concurrent import futures
+from typing import Dict, Optional
+
+import grpc
+
 from .base import BrokerInterface
+from .memory import MemoryBroker
 
-# 검증 필요
-# 1. gRPC 서버가 실행할 실제 로직 (Servicer)
-class InternalReceiver(edgeflow_pb2_grpc.WorkerServicer):
-    def __init__(self, buffer):
-        self.buffer = buffer # 데이터를 넘겨줄 큐
-        
-    def SendData(self, request, context):
-        # 외부에서 gRPC로 데이터를 쏘면, 여기로 들어옴
-        # 데이터를 받아서 내부 큐(Buffer)에 쏙 집어넣음
-        self.buffer.put(request.data)
-        return edgeflow_pb2.Response(status="OK")
-
-# 2. 브로커 (위장막)
-class GrpcBroker(Broker):
-    def __init__(self, port=50051):
-        self.internal_buffer = queue.Queue() # [중요] 임시 저장소
-        
-        # 백그라운드에서 gRPC 서버 시동
-        self.server = grpc.server(...)
-        edgeflow_pb2_grpc.add_WorkerServicer_to_server(
-            InternalReceiver(self.internal_buffer), self.server
-        )
-        self.server.add_insecure_port(f'[::]:{port}')
-        
-        # 별도 스레드에서 서버 실행 (메인 스레드는 방해 안 받게)
-        t = threading.Thread(target=self.server.start, daemon=True)
-        t.start()
-
-    def push(self, topic, data):
-        # 1. [Channel] 누구한테 전화 걸지 주소 입력 (연결선 만들기)
-        # (주의: 실제로는 topic에 매핑된 Consumer의 IP를 찾아야 함)
-        target_address = "localhost:50051" 
-        
-        # with 구문을 쓰면 통신 끝나고 자동으로 연결을 끊어줌 (리소스 관리)
-        with grpc.insecure_channel(target_address) as channel:
-            
-            # 2. [Stub] 그쪽 서버의 함수 목록을 아는 '대리인' 생성
-            # "... " 부분이 바로 이 줄입니다!
-            stub = edgeflow_pb2_grpc.WorkerStub(channel)
-            
-            # 3. [Call] 대리인을 시켜서 원격 함수 실행 (데이터 전송)
-            # (데이터를 Protobuf 규격인 FrameData로 포장해서 보냄)
-            request_packet = edgeflow_pb2.FrameData(
-                topic=topic, 
-                payload=data
-            )
-            
-            # 실제 전송 발생!
-            response = stub.SendData(request_packet)
-
-    def pop(self, topic, timeout=0.1):
-        # ConsumerNode가 이 함수를 호출함
-        # 사실은 gRPC 서버가 받아둔 데이터를 큐에서 꺼내줌
-        try:
-            return self.internal_buffer.get(timeout=timeout)
+_SERVICE = "edgeflow.Broker"
+_PUBLISH = f"/{_SERVICE}/Publish"      # stream packet -> stream ack
+_SUBSCRIBE = f"/{_SERVICE}/Subscribe"  # stream credit -> stream packet
+_CONTROL = f"/{_SERVICE}/Control"      # json -> json (trim / queue_size / stats / reset)
+
+_CHANNEL_OPTIONS = [
+    ('grpc.max_send_message_length', -1),     # 프레임 크기 제한 없음 (raw 이미지)
+    ('grpc.max_receive_message_length', -1),
+    ('grpc.keepalive_time_ms', 10000),
+]
+_POLL = 0.5     # 스트림 핸들러가 연결 종료를 확인하는 주기 (초)
+_CLOSE = object()
+
+
+def _identity(data):
+    return data
+
+
+# ========== Server ==========
+
+class _BrokerServicer:
+    """Server side of edgeflow.Broker (state lives in an in-process MemoryBroker)"""
+
+    def __init__(self, maxlen=100, name="grpc"):
+        self.store = MemoryBroker(name=name, maxlen=maxlen)
+
+    def Publish(self, request_iterator, context):
+        """Producer stream: append each packet, ack with its count"""
+        topic = dict(context.invocation_metadata()).get('topic')
+        count = 0
+        for packet in request_iterator:
+            self.store.push(topic, packet)
+            count += 1
+            yield str(count).encode()
+
+    def Subscribe(self, request_iterator, context):
+        """
+        Consumer stream
+        - group mode: next message of the consumer group, at most `window` unacknowledged (credit)
+        - latest mode (no group): newest message whenever it changes (slow links skip intermediates)
+        """
+        metadata = dict(context.invocation_metadata())
+        topic = metadata.get('topic')
+        group = metadata.get('group')
+
+        if not group:
+            yield from self._stream_latest(topic, context)
+            return
+
+        # [Flow Control] 클라이언트가 소비한 만큼만 크레딧을 돌려받아 전송
+        credits = threading.Semaphore(int(metadata.get('window', 1)))
+
+        def read_credits():
+            try:
+                for _ in request_iterator:
+                    credits.release()
+            except grpc.RpcError:
+                pass
+
+        threading.Thread(target=read_credits, daemon=True).start()
+
+        while context.is_active():
+            if not credits.acquire(timeout=_POLL):
+                continue
+            packet = self.store.pop(topic, timeout=_POLL, group=group)
+            if packet is None:
+                credits.release()
+                continue
+            yield packet
+
+    def _stream_latest(self, topic, context):
+        last_seq = None
+        while context.is_active():
+            stream = self.store._stream(topic)  # reset() 후에는 새 스트림
+            with stream.cond:
+                fresh = lambda: stream.entries and stream.entries[-1][0] != last_seq
+                if not stream.cond.wait_for(fresh, timeout=_POLL):
+                    continue
+                last_seq, packet = stream.entries[-1]
+            # yield는 HTTP/2 흐름 제어에 막힘 -> 그동안 쌓인 중간 프레임은 건너뜀
+            yield packet
+
+    def Control(self, request, context):
+        req = json.loads(request)
+        op = req.get('op')
+        if op == 'trim':
+            self.store.trim(req['topic'], req['size'])
+            result = True
+        elif op == 'queue_size':
+            result = self.store.queue_size(req['topic'])
+        elif op == 'stats':
+            result = self.store.get_queue_stats()
+        elif op == 'reset':
+            self.store.reset()
+            result = True
+        else:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown op: {op}")
+        return json.dumps(result).encode()
+
+
+def _service_handler(servicer):
+    return grpc.method_handlers_generic_handler(_SERVICE, {
+        'Publish': grpc.stream_stream_rpc_method_handler(
+            servicer.Publish, request_deserializer=_identity, response_serializer=_identity),
+        'Subscribe': grpc.stream_stream_rpc_method_handler(
+            servicer.Subscribe, request_deserializer=_identity, response_serializer=_identity),
+        'Control': grpc.unary_unary_rpc_method_handler(
+            servicer.Control, request_deserializer=_identity, response_serializer=_identity),
+    })
+
+
+def serve(port=50051, maxlen=100, max_workers=32, block=False):
+    """
+    Start the broker server
+    - max_workers: concurrent streams (each long-lived stream holds one worker)
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers), options=_CHANNEL_OPTIONS)
+    server.add_generic_rpc_handlers((_service_handler(_BrokerServicer(maxlen, name=f"grpc:{port}")),))
+    bound = server.add_insecure_port(f'[::]:{port}')
+    server.start()
+    print(f"📡 [gRPC] Broker server listening on :{bound}")
+    if block:
+        server.wait_for_termination()
+    return server
+
+
+# ========== Client ==========
+
+class _Publisher:
+    """One Publish stream: bounded send queue (blocks when the server/link falls behind)"""
+
+    def __init__(self, channel, topic, window):
+        self.queue = queue.Queue(maxsize=window)
+        self.sent = 0
+        self.acked = 0
+        self.alive = True
+        self.cond = threading.Condition()
+        call = channel.stream_stream(_PUBLISH, request_serializer=_identity,
+                                     response_deserializer=_identity)
+        self.responses = call(self._requests(), metadata=(('topic', topic),))
+        threading.Thread(target=self._read_acks, daemon=True).start()
+
+    def _requests(self):
+        while True:
+            packet = self.queue.get()
+            if packet is _CLOSE:
+                return
+            yield packet
+
+    def _read_acks(self):
+        try:
+            for _ in self.responses:
+                with self.cond:
+                    self.acked += 1
+                    self.cond.notify_all()
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.CANCELLED:
+                print(f"⚠️ [gRPC] Publish stream closed: {e.code().name}")
+        finally:
+            with self.cond:
+                self.alive = False
+                self.cond.notify_all()
+
+    def close(self):
+        try:
+            self.queue.put_nowait(_CLOSE)
+        except queue.Full:
+            pass  # cancel() ends the stream anyway
+        self.responses.cancel()
+
+
+class _Subscription:
+    """One Subscribe stream: bounded receive queue (group) or newest-only slot (latest)"""
+
+    def __init__(self, channel, topic, group, window):
+        self.group = group
+        self.credits = queue.Queue()
+        self.queue = queue.Queue(maxsize=window)  # 서버 크레딧 = window -> put이 막히지 않음
+        self.latest = None  # (seq, packet)
+        self.seq = 0
+        self.alive = True
+        self.cond = threading.Condition()
+        metadata = [('topic', topic), ('window', str(window))]
+        if group:
+            metadata.append(('group', group))
+        call = channel.stream_stream(_SUBSCRIBE, request_serializer=_identity,
+                                     response_deserializer=_identity)
+        self.responses = call(self._requests(), metadata=tuple(metadata))
+        threading.Thread(target=self._receive, daemon=True).start()
+
+    def _requests(self):
+        while True:
+            credit = self.credits.get()
+            if credit is _CLOSE:
+                return
+            yield credit
+
+    def _receive(self):
+        try:
+            for packet in self.responses:
+                if self.group:
+                    self.queue.put(packet)
+                else:
+                    with self.cond:
+                        self.seq += 1
+                        self.latest = (self.seq, packet)
+                        self.cond.notify_all()
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.CANCELLED:
+                print(f"⚠️ [gRPC] Subscribe stream closed: {e.code().name}")
+        finally:
+            with self.cond:
+                self.alive = False
+                self.cond.notify_all()
+
+    def take(self, timeout):
+        """Next group message (returns a credit to the server)"""
+        try:
+            packet = self.queue.get(timeout=timeout)
         except queue.Empty:
-            return None
\ No newline at end of file
+            return None
+        self.credits.put(b'')
+        return packet
+
+    def close(self):
+        self.credits.put(_CLOSE)
+        self.responses.cancel()
+
+
+class GrpcBroker(BrokerInterface):
+    """
+    gRPC Streaming Broker client
+    - push(): queued onto the topic's Publish stream (blocks up to push_timeout when `window` packets are in flight)
+    - pop(): consumer group delivery, up to `window` packets prefetched per topic
+    - pop_latest(): newest packet only (server skips frames the link could not carry)
+    """
+
+    def __init__(self, host="localhost", port=50051, window=8, push_timeout=1.0):
+        self.host = host
+        self.port = port
+        self.window = max(1, window)
+        self.push_timeout = push_timeout
+        self._channel = None
+        self._lock = threading.Lock()
+        self._publishers = {}     # topic -> _Publisher
+        self._subscriptions = {}  # (topic, group) -> _Subscription
+        self._topic_last_seq = {}  # pop_latest dedup
+
+    def _ensure_channel(self):
+        if self._channel is None:
+            self._channel = grpc.insecure_channel(f"{self.host}:{self.port}", options=_CHANNEL_OPTIONS)
+            self._control = self._channel.unary_unary(_CONTROL, request_serializer=_identity,
+                                                      response_deserializer=_identity)
+        return self._channel
+
+    def _publisher(self, topic) -> _Publisher:
+        publisher = self._publishers.get(topic)
+        if publisher is None or not publisher.alive:
+            with self._lock:
+                publisher = self._publishers.get(topic)
+                if publisher is None or not publisher.alive:
+                    # 끊어진 스트림만 다시 연다 (채널은 재사용)
+                    publisher = _Publisher(self._ensure_channel(), topic, self.window)
+                    self._publishers[topic] = publisher
+        return publisher
+
+    def _subscription(self, topic, group) -> _Subscription:
+        key = (topic, group)
+        subscription = self._subscriptions.get(key)
+        if subscription is None or not subscription.alive:
+            with self._lock:
+                subscription = self._subscriptions.get(key)
+                if subscription is None or not subscription.alive:
+                    subscription = _Subscription(self._ensure_channel(), topic, group, self.window)
+                    self._subscriptions[key] = subscription
+        return subscription
+
+    def push(self, topic: str, data: bytes):
+        if not data:
+            return
+        publisher = self._publisher(topic)
+        try:
+            # [Backpressure] 링크/서버가 느리면 window만큼 쌓인 뒤 여기서 막힘
+            publisher.queue.put(bytes(data), timeout=self.push_timeout)
+            with publisher.cond:
+                publisher.sent += 1
+        except queue.Full:
+            print(f"⚠️ [gRPC] Push dropped: stream '{topic}' is backed up")
+
+    def pop(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker"):
+        """
+        Read the next message for a consumer group
+        - consumer: accepted for interface compatibility (delivery is per group stream)
+        """
+        return self._subscription(topic, group or "default").take(timeout)
+
+    def pop_latest(self, topic: str, timeout: int = 1) -> Optional[bytes]:
+        """
+        Read the LATEST UNIQUE message (REALTIME mode).
+        - Returns None if nothing new arrives within timeout
+        """
+        subscription = self._subscription(topic, None)
+        last_seq = self._topic_last_seq.get(topic)
+        with subscription.cond:
+            fresh = lambda: subscription.latest is not None and subscription.latest[0] != last_seq
+            if not subscription.cond.wait_for(fresh, timeout=timeout):
+                return None
+            seq, packet = subscription.latest
+        self._topic_last_seq[topic] = seq
+        return packet
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until the server acknowledged every pushed packet"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for publisher in list(self._publishers.values()):
+            with publisher.cond:
+                done = lambda: publisher.acked >= publisher.sent or not publisher.alive
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                if not publisher.cond.wait_for(done, timeout=remaining):
+                    return False
+        return True
+
+    def _call(self, op, **fields):
+        self._ensure_channel()
+        return json.loads(self._control(json.dumps({'op': op, **fields}).encode(), timeout=5))
+
+    def trim(self, topic: str, size: int = 1):
+        try:
+            self._call('trim', topic=topic, size=size)
+        except grpc.RpcError:
+            pass
+
+    def queue_size(self, topic: str) -> int:
+        try:
+            return self._call('queue_size', topic=topic)
+        except grpc.RpcError:
+            return 0
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        try:
+            return self._call('stats')
+        except grpc.RpcError as e:
+            print(f"gRPC Stats Error: {e.code().name}")
+            return {}
+
+    def reset(self):
+        """Clear all server-side streams (called once by the main process on startup)"""
+        try:
+            self._call('reset')
+            print("🧹 [gRPC] System Reset: server streams cleared")
+        except grpc.RpcError as e:
+            print(f"⚠️ [gRPC] Failed to reset: {e.code().name}")
+
+    def close(self):
+        """Close all streams and the channel"""
+        with self._lock:
+            for stream in [*self._publishers.values(), *self._subscriptions.values()]:
+                stream.close()
+            self._publishers.clear()
+            self._subscriptions.clear()
+            if self._channel is not None:
+                self._channel.close()
+                self._channel = None
+
+    # ========== Serialization Protocol ==========
+
+    def to_config(self) -> dict:
+        return {
+            "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
+            "host": self.host,
+            "port": self.port,
+            "window": self.window,
+            "push_timeout": self.push_timeout
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'GrpcBroker':
+        return cls(
+            host=config.get("host", "localhost"),
+            port=config.get("port", 50051),
+            window=config.get("window", 8),
+            push_timeout=config.get("push_timeout", 1.0)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EdgeFlow gRPC broker server")
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument("--maxlen", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    serve(args.port, args.maxlen, args.workers, block=True)
@@ -1,114 +1,332 @@
 #edgeflow/comms/brokers/hybrid.py
-import zmq
+"""
+Hybrid Broker (ZeroMQ data plane + Redis signaling)
+- Data: producer PUB socket -> consumer SUB sockets (peer-to-peer, Redis never carries the payload)
+- Signal: frame key ("epoch:frame_id") in a Redis stream -> ordering / consumer groups / queue stats
+- Discovery: producer endpoint per topic in the Redis hash edgeflow:zmq:endpoints
+"""
+import os
+import socket
 import threading
-import pickle
 import time
-from collections import deque
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import zmq
+except ImportError:  # optional extra: pip install edgeflow[zmq]
+    zmq = None
+
 from .base import BrokerInterface
-from .redis_broker import RedisBroker # 기존 브로커 상속 혹은 포함
+from .redis import RedisBroker
+from ..frame import Frame
+from ...config import settings
+
+_ENDPOINTS_KEY = "edgeflow:zmq:endpoints"
+_POLL_MS = 500  # 수신 스레드가 종료 플래그를 확인하는 주기 (데이터는 도착 즉시 깨어남)
+
 
 class HybridBroker(BrokerInterface):
-    def __init__(self, redis_host='localhost', redis_port=6379, zmq_port=5555):
+    """
+    ZeroMQ PUB/SUB data plane with Redis Stream signaling
+    - PUB multipart: [topic\\0, frame key, *packet buffers] (frame key read from the fixed frame header)
+    - SUB side: one poller thread fills a bounded per-topic buffer (oldest frames evicted)
+    - pop(): Redis signal (consumer group) -> matching frame from the local buffer
+    - pop_latest(): newest received frame, no Redis round trip
+    """
+
+    def __init__(self, redis_host=None, redis_port=None, zmq_port=0, advertise_host=None,
+                 buffer_size=64, wait=0.2):
+        if zmq is None:
+            raise ImportError("HybridBroker requires the pyzmq package (pip install edgeflow[zmq])")
         # 1. Redis 연결 (신호용)
-        self.redis = RedisBroker(host=redis_host, port=redis_port)
-        
-        # 2. ZMQ 설정 (데이터용)
-        self.context = zmq.Context()
-        
-        # [송신용] PUB 소켓 (데이터 뿌리기)
-        self.pub_socket = self.context.socket(zmq.PUB)
-        self.pub_socket.bind(f"tcp://*:{zmq_port}")
-        
-        # [수신용] SUB 소켓 (데이터 받기)
-        self.sub_socket = self.context.socket(zmq.SUB)
-        # 실제 분산 환경에선 프로듀서 IP를 적어야 함 (여기선 로컬 가정)
-        self.sub_socket.connect(f"tcp://localhost:{zmq_port}") 
-        self.sub_socket.setsockopt_string(zmq.SUBSCRIBE, "") # 모든 토픽 수신
-        
-        # 3. 데이터 버퍼 (ID: Data 매핑용)
-        self.local_buffer = {} 
-        self.buffer_lock = threading.Lock()
-        
-        # 4. 백그라운드 수신 스레드 시작
+        self.redis = RedisBroker(host=redis_host or settings.REDIS_HOST, port=redis_port or settings.REDIS_PORT)
+
+        # 2. ZMQ 설정 (데이터용) - 소켓은 첫 push/pop 시 생성 (from_config 후 자식 프로세스에서 생성되도록)
+        self.zmq_port = zmq_port  # 0: 임의 포트 (같은 호스트에 여러 프로듀서)
+        self.advertise_host = advertise_host  # None: POD_IP 환경변수 -> hostname (프로세스마다 결정)
+        self.buffer_size = max(1, buffer_size)  # 토픽별 로컬 버퍼 최대 프레임 수
+        self.wait = wait  # 신호 도착 후 데이터를 기다리는 최대 시간 (초)
+        self._context = None
+        self._pub = None
+        self._endpoint = None
+        self._pub_lock = threading.Lock()
+        self._registered = set()  # 이 프로듀서가 엔드포인트를 등록한 토픽
+
+        # 3. 수신 버퍼 (topic -> OrderedDict[frame key -> packet])
+        self._buffers = {}
+        self._latest = {}  # topic -> (seq, packet) 가장 최근 수신 프레임
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._subscribed = {}  # topic -> endpoint
+        self._sub_lock = threading.Lock()
+        self._control = None  # inproc PUSH -> 수신 스레드 (SUB 소켓은 수신 스레드만 사용)
+        self._poller = None
+        self._topic_last_seq = {}  # pop_latest dedup
         self.running = True
-        self.listener = threading.Thread(target=self._zmq_listener, daemon=True)
-        self.listener.start()
-
-    def _zmq_listener(self):
-        """백그라운드에서 ZMQ 데이터를 계속 받아서 버퍼에 저장"""
-        while self.running:
-            try:
-                # ZMQ 패킷 구조: [Topic, Frame_ID, Data]
-                # 여기선 간단히 pickle로 통째로 받았다고 가정
-                raw_msg = self.sub_socket.recv(flags=zmq.NOBLOCK)
-                payload = pickle.loads(raw_msg)
-                
-                frame_id = payload['frame_id']
-                topic = payload['topic']
-                
-                with self.buffer_lock:
-                    # 버퍼에 저장 (키: "topic:frame_id")
-                    key = f"{topic}:{frame_id}"
-                    self.local_buffer[key] = payload['data']
-                    
-                    # (옵션) 버퍼 관리: 너무 오래된 데이터 삭제 로직 필요
-                    
-            except zmq.Again:
-                time.sleep(0.001) # 데이터 없으면 잠깐 쉼
-            except Exception as e:
-                print(f"ZMQ Error: {e}")
-
-    def push(self, topic, frame_bytes):
-        """
-        데이터는 ZMQ로, 신호는 Redis로!
-        """
-        # 1. 프레임 바이트에서 ID 추출 (구조체 파싱 필요하지만 여기선 가정)
-        # 실제론 Frame 객체를 받거나, bytes 앞부분 헤더를 읽어야 함
-        # 편의상 frame_bytes가 딕셔너리라고 가정하고 설명합니다.
-        # 실제 구현시엔 Frame.from_bytes()를 잠깐 해서 ID만 따야 함.
-        
-        # 예시 데이터 구조: {'frame_id': 100, 'topic': 'cam', 'data': ...}
-        import pickle
-        frame_obj = pickle.loads(frame_bytes) # (비효율적이지만 예시를 위해)
-        frame_id = frame_obj.frame_id
-        
-        # 2. Heavy Data -> ZMQ Broadcast
-        payload = {
-            'topic': topic,
-            'frame_id': frame_id,
-            'data': frame_bytes # 통째로 전송
-        }
-        self.pub_socket.send(pickle.dumps(payload))
-        
-        # 3. Light Signal -> Redis Queue
-        # Redis에는 "ID"만 보냄 (아주 가벼움!)
-        signal = f"{frame_id}".encode('utf-8')
-        self.redis.push(topic, signal)
-
-    def pop(self, topic, timeout=0.1):
+
+    def _ensure_context(self):
+        if self._context is None:
+            self._context = zmq.Context.instance()
+        return self._context
+
+    def _registry(self):
+        self.redis._ensure_connected()
+        return self.redis._redis
+
+    # ========== Publisher ==========
+
+    def _ensure_publisher(self, topic: str):
+        """Bind the PUB socket once and advertise its endpoint for this topic"""
+        if self._pub is None:
+            pub = self._ensure_context().socket(zmq.PUB)
+            pub.setsockopt(zmq.SNDHWM, self.buffer_size)
+            pub.setsockopt(zmq.LINGER, 0)
+            if self.zmq_port:
+                pub.bind(f"tcp://*:{self.zmq_port}")
+                port = self.zmq_port
+            else:
+                port = pub.bind_to_random_port("tcp://*")
+            self._pub = pub
+            host = self.advertise_host or os.getenv("POD_IP") or socket.gethostname()
+            self._endpoint = f"tcp://{host}:{port}"
+            print(f"📡 [Hybrid] Publishing on {self._endpoint}")
+        if topic not in self._registered:
+            self._registry().hset(_ENDPOINTS_KEY, topic, self._endpoint)
+            self._registered.add(topic)
+        return self._pub
+
+    def push(self, topic: str, data: bytes):
+        """데이터는 ZMQ로, 신호(frame key)는 Redis로"""
+        if not data:
+            return
+        self.push_buffers(topic, [data])
+
+    def push_buffers(self, topic: str, buffers: list):
+        """Send packet buffers as ZMQ multipart frames (no join)"""
+        # 1. 고정 헤더에서 프레임 식별자 추출 (페이로드 파싱 없음)
+        header = Frame.peek_header(buffers[0]) if buffers else None
+        if header is None:
+            print(f"⚠️ [Hybrid] Push skipped: not an EdgeFlow packet (topic={topic})")
+            return
+        key = f"{header.epoch}:{header.frame_id}".encode()
+
+        # ZMQ는 전송 완료 전까지 버퍼를 참조 -> 송신측이 재사용할 수 있는 쓰기 가능 뷰는 복사
+        parts = [bytes(buf) if isinstance(buf, memoryview) and not buf.readonly else buf for buf in buffers]
+
+        try:
+            # 2. Heavy Data -> ZMQ Broadcast
+            with self._pub_lock:
+                pub = self._ensure_publisher(topic)
+                pub.send_multipart([topic.encode() + b'\0', key, *parts], copy=False)
+
+            # 3. Light Signal -> Redis Stream (ID만 전송)
+            self.redis.push(topic, key)
+        except Exception as e:
+            print(f"⚠️ [Hybrid] Push Error: {e}")
+
+    # ========== Subscriber ==========
+
+    def _ensure_poller(self):
+        if self._poller is None:
+            address = f"inproc://edgeflow-hybrid-{id(self)}"
+            control = self._ensure_context().socket(zmq.PULL)
+            control.bind(address)
+            self._control = self._context.socket(zmq.PUSH)
+            self._control.connect(address)
+            self._poller = threading.Thread(target=self._poll_loop, args=(control,), daemon=True)
+            self._poller.start()
+
+    def _poll_loop(self, control):
+        """[Background] SUB 소켓에서 블로킹 poll -> 로컬 버퍼에 저장"""
+        sub = self._context.socket(zmq.SUB)
+        sub.setsockopt(zmq.RCVHWM, self.buffer_size)
+        sub.setsockopt(zmq.LINGER, 0)
+        poller = zmq.Poller()
+        poller.register(sub, zmq.POLLIN)
+        poller.register(control, zmq.POLLIN)
+        connected = set()
+
+        try:
+            while self.running:
+                events = dict(poller.poll(_POLL_MS))
+
+                if control in events:
+                    command, endpoint, prefix = control.recv_multipart()
+                    if command == b'stop':
+                        break
+                    if endpoint not in connected:
+                        sub.connect(endpoint.decode())
+                        connected.add(endpoint)
+                    sub.setsockopt(zmq.SUBSCRIBE, prefix)
+
+                if sub in events:
+                    # 도착한 메시지를 모두 비움 (poll 1회당 여러 프레임)
+                    while True:
+                        try:
+                            parts = sub.recv_multipart(zmq.NOBLOCK, copy=False)
+                        except zmq.Again:
+                            break
+                        self._store(parts)
+        except Exception as e:
+            print(f"⚠️ [Hybrid] Receiver Error: {e}")
+        finally:
+            sub.close()
+            control.close(linger=0)
+
+    def _store(self, parts):
+        if len(parts) < 3:
+            return
+        topic = parts[0].bytes[:-1].decode('utf-8')
+        key = parts[1].bytes.decode()
+        # 단일 버퍼는 ZMQ 메시지 위의 memoryview 그대로, 분할 버퍼는 한 번만 이어 붙임
+        data = parts[2].buffer if len(parts) == 3 else b''.join(part.buffer for part in parts[2:])
+
+        with self._cond:
+            buffer = self._buffers.setdefault(topic, OrderedDict())
+            buffer[key] = data
+            while len(buffer) > self.buffer_size:
+                buffer.popitem(last=False)  # 가장 오래된 프레임 제거
+            self._seq += 1
+            self._latest[topic] = (self._seq, data)
+            self._cond.notify_all()
+
+    def _subscribe(self, topic: str, refresh: bool = False) -> bool:
+        """Connect to the topic's producer (endpoint from the Redis registry)"""
+        if topic in self._subscribed and not refresh:
+            return True
+        with self._sub_lock:
+            endpoint = self._registry().hget(_ENDPOINTS_KEY, topic)
+            if endpoint is None:
+                return False
+            if self._subscribed.get(topic) == endpoint.decode():
+                return True
+            self._ensure_poller()
+            self._control.send_multipart([b'sub', endpoint, topic.encode() + b'\0'])
+            self._subscribed[topic] = endpoint.decode()
+            return True
+
+    def pop(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker"):
         """
-        Redis에서 신호(ID)를 받고, 로컬 버퍼에서 데이터를 찾음
+        Redis에서 신호(frame key)를 받고, 로컬 버퍼에서 데이터를 찾음
+        - consumer group 분배/순서는 Redis Stream이 담당
         """
-        # 1. Redis에서 티켓(ID) 꺼내기
-        signal = self.redis.pop(topic, timeout=timeout)
+        try:
+            self._subscribe(topic)
+        except Exception as e:
+            print(f"⚠️ [Hybrid] Subscribe Error: {e}")
+
+        # 1. Redis에서 티켓(frame key) 꺼내기
+        signal = self.redis.pop(topic, timeout=timeout, group=group, consumer=consumer)
         if not signal:
             return None
-            
-        target_id = int(signal.decode('utf-8'))
-        target_key = f"{topic}:{target_id}"
-        
-        # 2. ZMQ 버퍼에 데이터가 도착했는지 확인 (Spin-lock or Wait)
-        start_wait = time.time()
-        while time.time() - start_wait < 0.2: # 최대 0.2초 대기
-            with self.buffer_lock:
-                if target_key in self.local_buffer:
-                    # 데이터 찾음! 꺼내고 삭제
-                    data = self.local_buffer.pop(target_key)
-                    return data
-            time.sleep(0.001) # ZMQ 스레드가 채워줄 때까지 대기
-            
-        print(f"⚠️ Data missing for Ticket {target_id} (ZMQ Lag?)")
+        key = signal.decode()
+
+        # 2. ZMQ 수신 스레드가 버퍼에 채울 때까지 대기 (busy-wait 없음)
+        with self._cond:
+            buffer = self._buffers.setdefault(topic, OrderedDict())
+            if self._cond.wait_for(lambda: key in buffer, timeout=self.wait):
+                return buffer[key]
+
+        print(f"⚠️ [Hybrid] Data missing for {topic}:{key} (evicted or producer restarted)")
+        # 프로듀서가 재시작되어 엔드포인트가 바뀌었을 수 있음
+        self._subscribe(topic, refresh=True)
         return None
-        
-    def trim(self, topic, size):
-        self.redis.trim(topic, size)
\ No newline at end of file
+
+    def pop_latest(self, topic: str, timeout: int = 1) -> Optional[bytes]:
+        """
+        Read the LATEST UNIQUE frame (REALTIME mode) straight from the local buffer
+        - Returns None if no NEW frame arrives within timeout
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            while not self._subscribe(topic):
+                # 프로듀서가 아직 첫 프레임을 보내지 않음
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                time.sleep(min(remaining, 0.1))
+        except Exception as e:
+            print(f"⚠️ [Hybrid] Subscribe Error: {e}")
+            return None
+
+        last_seq = self._topic_last_seq.get(topic)
+        with self._cond:
+            fresh = lambda: topic in self._latest and self._latest[topic][0] != last_seq
+            if not self._cond.wait_for(fresh, timeout=max(0, deadline - time.monotonic())):
+                return None
+            seq, data = self._latest[topic]
+        self._topic_last_seq[topic] = seq
+        return data
+
+    # ========== Queue Management (Redis signal stream) ==========
+
+    def trim(self, topic: str, size: int = 1):
+        self.redis.trim(topic, size)
+
+    def register_topic(self, topic: str, maxlen: int, approximate: bool = True):
+        self.redis.register_topic(topic, maxlen, approximate)
+
+    def queue_size(self, topic: str) -> int:
+        return self.redis.queue_size(topic)
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        return self.redis.get_queue_stats()
+
+    async def aqueue_size(self, topic: str) -> int:
+        return await self.redis.aqueue_size(topic)
+
+    async def aget_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        return await self.redis.aget_queue_stats()
+
+    def reset(self):
+        """
+        Reset Broker State (FLUSHALL: signal streams + endpoint registry)
+        - Called ONLY by the main system process on startup
+        """
+        try:
+            self._registry().flushall()
+            self._registered.clear()
+            self.redis._known_topics.clear()
+            with self._cond:
+                self._buffers.clear()
+                self._latest.clear()
+            print("🧹 [Hybrid] System Reset: FLUSHALL executed")
+        except Exception as e:
+            print(f"⚠️ [Hybrid] Failed to reset: {e}")
+
+    def close(self):
+        """Stop the receiver thread and close sockets"""
+        self.running = False
+        if self._poller is not None:
+            self._control.send_multipart([b'stop', b'', b''])
+            self._poller.join(timeout=1)
+            self._control.close(linger=0)
+            self._poller = None
+        if self._pub is not None:
+            self._pub.close()
+            self._pub = None
+
+    # ========== Serialization Protocol ==========
+
+    def to_config(self) -> dict:
+        return {
+            "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
+            "host": self.redis.host,
+            "port": self.redis.port,
+            "zmq_port": self.zmq_port,
+            "advertise_host": self.advertise_host,
+            "buffer_size": self.buffer_size,
+            "wait": self.wait
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'HybridBroker':
+        return cls(
+            redis_host=config.get("host"),
+            redis_port=config.get("port"),
+            zmq_port=config.get("zmq_port", 0),
+            advertise_host=config.get("advertise_host"),
+            buffer_size=config.get("buffer_size", 64),
+            wait=config.get("wait", 0.2)
+        )
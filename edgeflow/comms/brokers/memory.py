@@ -0,0 +1,163 @@
+#edgeflow/comms/brokers/memory.py
+"""
+In-process broker for thread mode (System.run(mode="threads"))
+- Streams live in process memory: no serialization, no Redis
+- Frame objects are passed by reference (accepts_frames)
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict
+from .base import BrokerInterface
+
+
+class _Stream:
+    """One topic: bounded entry log + consumer group cursors"""
+
+    def __init__(self, maxlen):
+        self.entries = deque()  # (seq, value), oldest first
+        self.next_seq = 1
+        self.limit = None       # set by trim()
+        self.maxlen = maxlen
+        self.groups = {}        # group -> last delivered seq
+        self.cond = threading.Condition()
+
+    def append(self, value):
+        with self.cond:
+            self.entries.append((self.next_seq, value))
+            self.next_seq += 1
+            self._evict()
+            self.cond.notify_all()
+
+    def _evict(self):
+        bound = min(self.maxlen, self.limit) if self.limit else self.maxlen
+        while len(self.entries) > bound:
+            self.entries.popleft()
+
+    def next_for_group(self, group):
+        """Oldest entry this group has not received yet (caller holds cond)"""
+        if not self.entries:
+            return None
+        # New groups start from the oldest retained entry (same as XGROUP CREATE ... 0)
+        cursor = self.groups.get(group, 0)
+        first_seq = self.entries[0][0]
+        if self.next_seq - 1 <= cursor:
+            return None
+        seq, value = self.entries[max(0, cursor + 1 - first_seq)]
+        self.groups[group] = seq
+        return value
+
+
+# Streams shared by every MemoryBroker with the same name in this process
+# (from_config() in thread mode attaches to the same store instead of copying it)
+_STORES: Dict[str, Dict[str, _Stream]] = {}
+_STORES_LOCK = threading.Lock()
+
+
+class MemoryBroker(BrokerInterface):
+    """In-memory stream broker with consumer group and latest-only semantics"""
+
+    accepts_frames = True  # push() may receive Frame objects (kept as-is, not serialized)
+
+    def __init__(self, name: str = "default", maxlen: int = 100):
+        self.name = name
+        self.maxlen = maxlen  # Stream max length
+        with _STORES_LOCK:
+            self._streams = _STORES.setdefault(name, {})
+        self._local = threading.local()  # per-thread last seen seq for pop_latest
+
+    def _stream(self, topic: str) -> _Stream:
+        stream = self._streams.get(topic)
+        if stream is None:
+            with _STORES_LOCK:
+                stream = self._streams.setdefault(topic, _Stream(self.maxlen))
+        return stream
+
+    def _last_seen(self) -> Dict[str, int]:
+        last_seen = getattr(self._local, 'last_seen', None)
+        if last_seen is None:
+            last_seen = self._local.last_seen = {}
+        return last_seen
+
+    def push(self, topic: str, data):
+        """Append a message (bytes or Frame) to the topic stream"""
+        if data is None:
+            return
+        self._stream(topic).append(data)
+
+    def push_buffers(self, topic: str, buffers: list):
+        """Buffers may be views over the sender's arrays -> joined into an owned copy"""
+        self.push(topic, b''.join(buffers))
+
+    def pop(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker"):
+        """
+        Read the next message for a consumer group (each message goes to ONE consumer of the group)
+        - consumer: accepted for interface compatibility (delivery is per group)
+        """
+        stream = self._stream(topic)
+        deadline = time.monotonic() + timeout
+        with stream.cond:
+            while True:
+                value = stream.next_for_group(group)
+                if value is not None:
+                    return value
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                stream.cond.wait(remaining)
+
+    def pop_latest(self, topic: str, timeout: int = 1):
+        """
+        Read the LATEST UNIQUE message (REALTIME mode).
+        - Returns None if nothing newer than what this thread last read arrives within timeout
+        """
+        stream = self._stream(topic)
+        last_seen = self._last_seen()
+        deadline = time.monotonic() + timeout
+        with stream.cond:
+            while True:
+                if stream.entries:
+                    seq, value = stream.entries[-1]
+                    if seq != last_seen.get(topic):
+                        last_seen[topic] = seq
+                        return value
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                stream.cond.wait(remaining)
+
+    def trim(self, topic: str, size: int = 1):
+        """Bound the stream to `size` entries"""
+        stream = self._stream(topic)
+        with stream.cond:
+            stream.limit = size
+            stream._evict()
+
+    def queue_size(self, topic: str) -> int:
+        stream = self._streams.get(topic)
+        return len(stream.entries) if stream else 0
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return stats for all streams"""
+        return {topic: {"current": len(stream.entries), "max": stream.limit or stream.maxlen}
+                for topic, stream in list(self._streams.items())}
+
+    def reset(self):
+        """Drop every stream of this store"""
+        with _STORES_LOCK:
+            self._streams.clear()
+        self._local = threading.local()
+
+    # ========== Serialization Protocol ==========
+
+    def to_config(self) -> dict:
+        return {
+            "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
+            "name": self.name,
+            "maxlen": self.maxlen
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'MemoryBroker':
+        # Same process only: attaches to the existing store of that name
+        return cls(name=config.get("name", "default"), maxlen=config.get("maxlen", 100))
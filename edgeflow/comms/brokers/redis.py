@@ -3,26 +3,119 @@
 Redis Stream-based Broker for fan-out and consumer group support
 """
 import redis
+import redis.asyncio as aioredis
+import threading
 import time
 import os
 from typing import Dict, Optional
 from .base import BrokerInterface
 
 
+# [REALTIME] Newest unseen entry in ONE round trip (cached via EVALSHA)
+# KEYS[1] = stream, ARGV[1] = last seen id, ARGV[2] = field to return,
+# ARGV[3] = blob key prefix (non-empty: field holds a blob key on this instance -> GET it too)
+# ARGV[4] = optional inline field (present in the entry -> returned as-is, no blob lookup)
+# ARGV[5] = optional head field (content-addressed entry: frame head kept in the entry, blob = payload)
+# Returns nil (empty stream), {id} (nothing new), {id, value}, {id, inline value, 1} or {id, value, 0, head}
+LATEST_ENTRY_LUA = """
+local entries = redis.call('XREVRANGE', KEYS[1], '+', '-', 'COUNT', 1)
+if #entries == 0 then return nil end
+local id = entries[1][1]
+if id == ARGV[1] then return {id} end
+local fields = entries[1][2]
+local value, head = false, false
+for i = 1, #fields, 2 do
+    if fields[i] == ARGV[4] then return {id, fields[i + 1], 1} end
+    if fields[i] == ARGV[2] then value = fields[i + 1] end
+    if fields[i] == ARGV[5] then head = fields[i + 1] end
+end
+if value and ARGV[3] ~= '' then
+    value = redis.call('GET', ARGV[3] .. value)
+end
+if head then return {id, value, 0, head} end
+return {id, value}
+"""
+
+# Topic registry: hash topic -> stream limit (maintained on first push / trim, replaces KEYS scans)
+TOPICS_KEY = "edgeflow:topics"
+
+# [Stats] Every registered topic's limit + XLEN in ONE round trip
+# KEYS[1] = topic registry hash. Returns a flat list {topic, limit, length, ...}
+QUEUE_STATS_LUA = """
+local topics = redis.call('HGETALL', KEYS[1])
+local result = {}
+for i = 1, #topics, 2 do
+    local length = redis.pcall('XLEN', topics[i])
+    if type(length) ~= 'number' then length = 0 end
+    result[#result + 1] = topics[i]
+    result[#result + 1] = topics[i + 1]
+    result[#result + 1] = length
+end
+return result
+"""
+
+
+def parse_queue_stats(reply, default_max):
+    """QUEUE_STATS_LUA reply -> {topic: {"current", "max"}}"""
+    stats = {}
+    for i in range(0, len(reply or ()), 3):
+        topic, limit, current = reply[i:i + 3]
+        stats[topic.decode('utf-8')] = {"current": current, "max": int(limit) if limit else default_max}
+    return stats
+
+
+class QueueStatsCache:
+    """
+    get_queue_stats() result shared by all callers for `ttl` seconds
+    (dashboards poll every 100 ms; one scripted fetch serves every poll/tab within the TTL)
+    """
+
+    def __init__(self, ttl=0.5):
+        self.ttl = ttl
+        self._stats = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._stats is not None and time.monotonic() < self._expires:
+            return self._stats
+        return None
+
+    def put(self, stats):
+        with self._lock:
+            self._stats = stats
+            self._expires = time.monotonic() + self.ttl
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._stats = None
+
+
 class RedisBroker(BrokerInterface):
     """Redis Stream-based message broker"""
     
-    def __init__(self, host=None, port=None, maxlen=100):
+    def __init__(self, host=None, port=None, maxlen=100, stats_ttl=0.5):
         self.host = host or os.getenv('REDIS_HOST', 'localhost')
         self.port = port or int(os.getenv('REDIS_PORT', 6379))
         self.maxlen = maxlen  # Stream max length (approximate)
         self._redis = None
         self._consumer_groups = set()  # Track created groups
         self._topic_last_id = {}  # Track last seen ID per topic
+        self._known_topics = set()  # Topics already in the registry (first push registers)
+        self._topic_limits = {}  # topic -> (maxlen, approximate) applied inside XADD
+        self._latest_script = None
+        self._stats_script = None
+        self._stats_cache = QueueStatsCache(stats_ttl)
+        self._aredis = None  # redis.asyncio client (created on first async call)
+        self._alatest_script = None
+        self._astats_script = None
 
     def _ensure_connected(self):
         if self._redis is None:
             self._redis = self._connect()
+            self._latest_script = self._redis.register_script(LATEST_ENTRY_LUA)
+            self._stats_script = self._redis.register_script(QUEUE_STATS_LUA)
     
     def _connect(self):
         wait_time = 1
@@ -61,8 +154,12 @@ class RedisBroker(BrokerInterface):
             return
         self._ensure_connected()
         try:
-            # XADD with approximate maxlen for auto-trimming
-            self._redis.xadd(topic, {'data': data}, maxlen=self.maxlen, approximate=True)
+            if topic not in self._known_topics:
+                self._redis.hsetnx(TOPICS_KEY, topic, self._topic_limits.get(topic, (self.maxlen,))[0])
+                self._known_topics.add(topic)
+            # XADD with the topic's registered maxlen (one command per publish)
+            maxlen, approximate = self._topic_limits.get(topic, (self.maxlen, True))
+            self._redis.xadd(topic, {'data': data}, maxlen=maxlen, approximate=approximate)
         except Exception as e:
             print(f"Redis Push Error: {e}")
 
@@ -111,10 +208,21 @@ class RedisBroker(BrokerInterface):
         self._ensure_connected()
         try:
             self._redis.xtrim(topic, maxlen=size, approximate=True)
-            self._redis.set(f"edgeflow:meta:limit:{topic}", size)
+            self._redis.hset(TOPICS_KEY, topic, size)
+            self._known_topics.add(topic)
         except Exception:
             pass
 
+    def register_topic(self, topic: str, maxlen: int, approximate: bool = True):
+        """Set the topic's stream limit once; every later XADD applies it (no per-frame XTRIM)"""
+        self._topic_limits[topic] = (maxlen, approximate)
+        self._ensure_connected()
+        try:
+            self._redis.hset(TOPICS_KEY, topic, maxlen)
+            self._known_topics.add(topic)
+        except Exception as e:
+            print(f"Redis Register Error: {e}")
+
     def queue_size(self, topic: str) -> int:
         """Return stream length"""
         self._ensure_connected()
@@ -124,67 +232,146 @@ class RedisBroker(BrokerInterface):
             return 0
 
     def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
-        """Return stats for all tracked streams"""
+        """Return stats for all registered streams (one scripted round trip, cached for stats_ttl)"""
+        stats = self._stats_cache.get()
+        if stats is not None:
+            return stats
         self._ensure_connected()
-        stats = {}
         try:
-            meta_keys = self._redis.keys("edgeflow:meta:limit:*")
-            
-            for key in meta_keys:
-                key_str = key.decode('utf-8')
-                topic = key_str.replace("edgeflow:meta:limit:", "")
-                
-                limit_bytes = self._redis.get(key)
-                limit = int(limit_bytes) if limit_bytes else self.maxlen
-                current = self._redis.xlen(topic)
-                
-                stats[topic] = {"current": current, "max": limit}
+            return self._stats_cache.put(parse_queue_stats(self._stats_script(keys=[TOPICS_KEY]), self.maxlen))
         except Exception as e:
             print(f"Redis Stats Error: {e}")
-        return stats
+            return {}
 
 
     def pop_latest(self, topic: str, timeout: int = 1) -> Optional[bytes]:
         """
         Read the LATEST UNIQUE message (REALTIME mode).
         - Dedplicates frames: Returns None if no NEW frame exists
-        - Efficient waiting: Blocks until new data arrives
+        - 1 round trip when a new frame exists (Lua: tip check + data)
+        - Otherwise blocks with XREAD from the last seen id and returns what arrives directly
         """
         self._ensure_connected()
         try:
-            start_time = time.time()
+            last_seen = self._topic_last_id.get(topic)
+            result = self._latest_script(keys=[topic], args=[last_seen or '', 'data', ''])
+            if result and len(result) == 2:
+                self._topic_last_id[topic] = result[0]
+                return result[1]
+
+            # Nothing new: block from the last seen id (not '$' -> no frame lost between the two calls)
+            block_ms = max(1, int(timeout * 1000))
+            streams = self._redis.xread({topic: last_seen or '0-0'}, block=block_ms)
+            if not streams:
+                return None
+
+            # Take the newest of whatever arrived while blocked
+            msg_id, fields = streams[0][1][-1]
+            self._topic_last_id[topic] = msg_id
+            return fields.get(b'data')
             
-            while True:
-                # 1. Get current tip
-                entries = self._redis.xrevrange(topic, count=1)
-                
-                if entries:
-                    msg_id, fields = entries[0]
-                    last_seen = self._topic_last_id.get(topic)
-                    
-                    if msg_id != last_seen:
-                        # New frame found!
-                        self._topic_last_id[topic] = msg_id
-                        data = fields.get(b'data')
-                        return data
-                
-                # Check timeout
-                elapsed = time.time() - start_time
-                remaining = timeout - elapsed
-                if remaining <= 0:
-                    return None
-                
-                # 2. Wait for NEW data using XREAD with '$'
-                try:
-                    block_ms = int(remaining * 1000)
-                    self._redis.xread({topic: '$'}, count=1, block=block_ms)
-                except redis.exceptions.ResponseError:
-                    time.sleep(0.1)
+        except Exception as e:
+            print(f"Redis PopLatest Error: {e}")
+            return None
+
+    # ========== Async API (redis.asyncio) ==========
+
+    def _ensure_async(self):
+        if self._aredis is None:
+            self._aredis = aioredis.Redis(host=self.host, port=self.port, socket_timeout=5)
+            self._alatest_script = self._aredis.register_script(LATEST_ENTRY_LUA)
+            self._astats_script = self._aredis.register_script(QUEUE_STATS_LUA)
+        return self._aredis
+
+    async def _aensure_consumer_group(self, stream: str, group: str):
+        key = f"{stream}:{group}"
+        if key in self._consumer_groups:
+            return
+        try:
+            await self._ensure_async().xgroup_create(stream, group, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._consumer_groups.add(key)
+
+    async def apush(self, topic: str, data: bytes):
+        if not data:
+            return
+        try:
+            r = self._ensure_async()
+            if topic not in self._known_topics:
+                await r.hsetnx(TOPICS_KEY, topic, self._topic_limits.get(topic, (self.maxlen,))[0])
+                self._known_topics.add(topic)
+            maxlen, approximate = self._topic_limits.get(topic, (self.maxlen, True))
+            await r.xadd(topic, {'data': data}, maxlen=maxlen, approximate=approximate)
+        except Exception as e:
+            print(f"Redis Push Error: {e}")
+
+    async def apush_buffers(self, topic: str, buffers: list):
+        await self.apush(topic, b''.join(buffers))
+
+    async def apop(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker"):
+        r = self._ensure_async()
+        try:
+            await self._aensure_consumer_group(topic, group)
+            result = await r.xreadgroup(
+                groupname=group,
+                consumername=consumer,
+                streams={topic: '>'},
+                count=1,
+                block=int(timeout * 1000)
+            )
+            if not result or not result[0][1]:
+                return None
+            
+            msg_id, fields = result[0][1][0]
+            await r.xack(topic, group, msg_id)
+            return fields.get(b'data')
+            
+        except Exception as e:
+            print(f"Redis Pop Error: {e}")
+            return None
+
+    async def apop_latest(self, topic: str, timeout: int = 1) -> Optional[bytes]:
+        r = self._ensure_async()
+        try:
+            last_seen = self._topic_last_id.get(topic)
+            result = await self._alatest_script(keys=[topic], args=[last_seen or '', 'data', ''])
+            if result and len(result) == 2:
+                self._topic_last_id[topic] = result[0]
+                return result[1]
+
+            streams = await r.xread({topic: last_seen or '0-0'}, block=max(1, int(timeout * 1000)))
+            if not streams:
+                return None
+
+            msg_id, fields = streams[0][1][-1]
+            self._topic_last_id[topic] = msg_id
+            return fields.get(b'data')
             
         except Exception as e:
             print(f"Redis PopLatest Error: {e}")
             return None
 
+    async def aqueue_size(self, topic: str) -> int:
+        try:
+            return await self._ensure_async().xlen(topic)
+        except Exception:
+            return 0
+
+    async def aget_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Same as get_queue_stats (shares its cache)"""
+        stats = self._stats_cache.get()
+        if stats is not None:
+            return stats
+        self._ensure_async()
+        try:
+            reply = await self._astats_script(keys=[TOPICS_KEY])
+            return self._stats_cache.put(parse_queue_stats(reply, self.maxlen))
+        except Exception as e:
+            print(f"Redis Stats Error: {e}")
+            return {}
+
     # ========== Serialization Protocol ==========
     
     def to_config(self) -> dict:
@@ -192,7 +379,8 @@ class RedisBroker(BrokerInterface):
             "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
             "host": self.host,
             "port": self.port,
-            "maxlen": self.maxlen
+            "maxlen": self.maxlen,
+            "stats_ttl": self._stats_cache.ttl
         }
     
     @classmethod
@@ -200,5 +388,6 @@ class RedisBroker(BrokerInterface):
         return cls(
             host=config.get("host"),
             port=config.get("port"),
-            maxlen=config.get("maxlen", 100)
+            maxlen=config.get("maxlen", 100),
+            stats_ttl=config.get("stats_ttl", 0.5)
         )
\ No newline at end of file
@@ -0,0 +1,392 @@
+# edgeflow/comms/brokers/shm.py
+"""
+Shared Memory Ring-Buffer Broker (same-host nodes, no Redis in the data path)
+- One shared memory segment per topic: fixed-size slots used as a ring
+- REALTIME (pop_latest): lock-free read of the newest slot
+- DURABLE (pop): per-group cursor in shared memory (competing consumers within a group)
+- Writers are serialized with flock (multiple producer processes per topic)
+"""
+import os
+import re
+import time
+import struct
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, Optional
+from .base import BrokerInterface
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+_MAGIC = b'EFSHMv1\x00'
+# magic(8s) + slots(I) + slot_size(I) + write_seq(Q) + limit(Q) + topic(64s)
+_HEADER = struct.Struct('=8sIIQQ64s')
+_WRITE_SEQ_OFFSET = 16
+_LIMIT_OFFSET = 24
+_U64 = struct.Struct('=Q')
+
+# Group cursor table: name hash(Q) + last consumed seq(Q)
+_GROUP = struct.Struct('=QQ')
+_GROUPS_OFFSET = 128
+_MAX_GROUPS = 16
+
+# Slot: seq(Q) + length(Q) + data (seq == 0 while being written)
+_SLOT = struct.Struct('=QQ')
+_SLOTS_OFFSET = _GROUPS_OFFSET + _GROUP.size * _MAX_GROUPS
+_ALIGN = 64
+
+# Polling backoff while waiting for new data (seconds)
+_MIN_WAIT = 0.0002
+_MAX_WAIT = 0.005
+
+_SHM_DIR = "/dev/shm"
+
+
+def _attach_untracked(name, create=False, size=0):
+    """
+    SharedMemory without resource_tracker ownership
+    - Segments must outlive the process that created/attached them (producer restarts, child exits);
+      they are removed explicitly by reset()/unlink()
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+def _check_capacity(name, size):
+    """
+    Refuse a segment that /dev/shm cannot back
+    - Segments are sparse: an oversized one is created fine, and the process dies with SIGBUS
+      only when a later slot is written (Docker / K8s default /dev/shm is 64 MiB)
+    """
+    try:
+        stat = os.statvfs(_SHM_DIR)
+        names = os.listdir(_SHM_DIR)
+    except OSError:
+        return  # No /dev/shm (macOS): nothing to check
+    committed = 0
+    for entry in names:
+        try:
+            committed += os.stat(os.path.join(_SHM_DIR, entry)).st_size
+        except OSError:
+            pass
+    capacity = stat.f_blocks * stat.f_frsize
+    if committed + size > capacity:
+        raise RuntimeError(
+            f"Shared memory segment '{name}' needs {size / 2**20:.1f} MiB but {_SHM_DIR} has only "
+            f"{max(0, capacity - committed) / 2**20:.1f} MiB of {capacity / 2**20:.0f} MiB left "
+            f"(lower slots / slot_size, or enlarge /dev/shm, e.g. docker run --shm-size)"
+        )
+
+
+class _Ring:
+    """[Internal] One topic segment (process-local handle)"""
+
+    def __init__(self, name, topic, slots, slot_size):
+        self.name = name
+        self.topic = topic
+        self._thread_lock = threading.Lock()
+        self._lock_fd = os.open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o666)
+
+        stride = -(-(_SLOT.size + slot_size) // _ALIGN) * _ALIGN
+        size = _SLOTS_OFFSET + stride * slots
+        if not os.path.exists(os.path.join(_SHM_DIR, name)):
+            _check_capacity(name, size)
+        try:
+            self.shm = _attach_untracked(name, create=True, size=size)
+            topic_bytes = topic.encode('utf-8')[:64]
+            # Magic last: attaching processes wait for it
+            _HEADER.pack_into(self.shm.buf, 0, b'\x00' * 8, slots, slot_size, 0, 0, topic_bytes)
+            self.shm.buf[0:8] = _MAGIC
+        except FileExistsError:
+            self.shm = _attach_untracked(name)
+            deadline = time.time() + 1.0
+            while bytes(self.shm.buf[0:8]) != _MAGIC:
+                if time.time() > deadline:
+                    raise RuntimeError(f"Shared memory segment '{name}' is not initialized")
+                time.sleep(_MIN_WAIT)
+
+        # Geometry always comes from the segment (creator's config wins)
+        _, self.slots, self.slot_size, _, _, _ = _HEADER.unpack_from(self.shm.buf, 0)
+        self.stride = -(-(_SLOT.size + self.slot_size) // _ALIGN) * _ALIGN
+        self.buf = self.shm.buf
+
+    @contextmanager
+    def locked(self):
+        with self._thread_lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    @property
+    def write_seq(self):
+        return _U64.unpack_from(self.buf, _WRITE_SEQ_OFFSET)[0]
+
+    @property
+    def window(self):
+        """Number of retained messages (ring size, or trim() limit if smaller)"""
+        limit = _U64.unpack_from(self.buf, _LIMIT_OFFSET)[0]
+        return min(self.slots, limit) if limit else self.slots
+
+    def set_limit(self, size):
+        _U64.pack_into(self.buf, _LIMIT_OFFSET, max(0, int(size)))
+
+    def _slot_offset(self, seq):
+        return _SLOTS_OFFSET + ((seq - 1) % self.slots) * self.stride
+
+    def write(self, buffers):
+        length = sum(len(buf) for buf in buffers)
+        if length > self.slot_size:
+            raise ValueError(f"Message of {length} bytes exceeds slot size {self.slot_size} (topic '{self.topic}')")
+
+        with self.locked():
+            seq = self.write_seq + 1
+            offset = self._slot_offset(seq)
+            _SLOT.pack_into(self.buf, offset, 0, length)  # in progress -> readers skip
+            pos = offset + _SLOT.size
+            for buf in buffers:
+                size = len(buf)
+                self.buf[pos:pos + size] = buf
+                pos += size
+            _U64.pack_into(self.buf, offset, seq)
+            _U64.pack_into(self.buf, _WRITE_SEQ_OFFSET, seq)
+
+    def read(self, seq):
+        """Copy out message `seq` (None if overwritten or being written - seqlock check)"""
+        offset = self._slot_offset(seq)
+        slot_seq, length = _SLOT.unpack_from(self.buf, offset)
+        if slot_seq != seq:
+            return None
+        data = bytes(self.buf[offset + _SLOT.size:offset + _SLOT.size + length])
+        if _U64.unpack_from(self.buf, offset)[0] != seq:
+            return None
+        return data
+
+    def claim(self, group):
+        """Advance the group's cursor by one -> claimed seq (None if nothing new)"""
+        key = int.from_bytes(hashlib.blake2b(group.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+        with self.locked():
+            write_seq = self.write_seq
+            free = None
+            for i in range(_MAX_GROUPS):
+                entry = _GROUPS_OFFSET + i * _GROUP.size
+                gkey, cursor = _GROUP.unpack_from(self.buf, entry)
+                if gkey == key:
+                    break
+                if gkey == 0 and free is None:
+                    free = entry
+            else:
+                if free is None:
+                    raise RuntimeError(f"Too many consumer groups on topic '{self.topic}' (max {_MAX_GROUPS})")
+                # New group: start from the oldest retained message (like XGROUP CREATE ... 0)
+                entry, cursor = free, max(0, write_seq - self.window)
+
+            # Messages older than the window were overwritten/trimmed -> skip ahead
+            seq = max(cursor + 1, write_seq - self.window + 1)
+            if seq > write_seq:
+                _GROUP.pack_into(self.buf, entry, key, cursor)
+                return None
+            _GROUP.pack_into(self.buf, entry, key, seq)
+            return seq
+
+    def backlog(self):
+        """Unread messages of the slowest group (retained messages if no group)"""
+        write_seq = self.write_seq
+        cursors = [cursor for gkey, cursor in
+                   (_GROUP.unpack_from(self.buf, _GROUPS_OFFSET + i * _GROUP.size) for i in range(_MAX_GROUPS))
+                   if gkey]
+        oldest = min(cursors) if cursors else 0
+        return min(write_seq - oldest, self.window)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        os.close(self._lock_fd)
+
+
+class SharedMemoryBroker(BrokerInterface):
+    """
+    Shared memory broker for nodes running on the same host
+    - prefix: namespace for segment names (one per System)
+    - slots: messages retained per topic (ring size)
+    - slot_size: max bytes per message (1080p raw frame ~ 6MB, 4K ~ 25MB -> raise for raw video links)
+    - Each topic reserves slots * slot_size in /dev/shm (default 32 MiB, fits a 64 MiB container /dev/shm)
+    """
+
+    def __init__(self, prefix="edgeflow", slots=8, slot_size=4 * 1024 * 1024):
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryBroker requires a POSIX platform (fcntl)")
+        self.prefix = re.sub(r'[^A-Za-z0-9_.-]', '_', prefix)
+        self.slots = slots
+        self.slot_size = slot_size
+        self._rings = {}          # topic -> _Ring (attached lazily)
+        self._topic_last_seq = {}  # REALTIME: last returned seq per topic
+
+    def _segment_name(self, topic):
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', topic)[:48]
+        digest = hashlib.blake2b(topic.encode('utf-8'), digest_size=4).hexdigest()
+        return f"{self.prefix}-{safe}-{digest}"
+
+    def _ring(self, topic) -> _Ring:
+        ring = self._rings.get(topic)
+        if ring is None:
+            ring = self._rings[topic] = _Ring(self._segment_name(topic), topic, self.slots, self.slot_size)
+        return ring
+
+    def push(self, topic: str, data: bytes):
+        if data:
+            self.push_buffers(topic, [data])
+
+    def push_buffers(self, topic: str, buffers: list):
+        """Parts are copied straight into the slot (no concatenation)"""
+        try:
+            self._ring(topic).write(buffers)
+        except Exception as e:
+            print(f"SHM Push Error: {e}")
+
+    def _wait(self, read, timeout):
+        """[Internal] Poll read() with exponential backoff until it returns data or timeout"""
+        deadline = time.time() + timeout
+        delay = _MIN_WAIT
+        while True:
+            data = read()
+            if data is not None:
+                return data
+            if time.time() >= deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, _MAX_WAIT)
+
+    def pop(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker") -> Optional[bytes]:
+        """DURABLE: every group sees every retained message, once per group"""
+        ring = self._ring(topic)
+
+        def read():
+            while True:
+                seq = ring.claim(group)
+                if seq is None:
+                    return None
+                data = ring.read(seq)
+                if data is not None:
+                    return data
+                # Overwritten between claim and read -> lost, try the next one
+
+        try:
+            return self._wait(read, timeout)
+        except Exception as e:
+            print(f"SHM Pop Error: {e}")
+            return None
+
+    def pop_latest(self, topic: str, timeout: int = 1) -> Optional[bytes]:
+        """REALTIME: newest message not yet returned to this process (lock-free)"""
+        ring = self._ring(topic)
+
+        def read():
+            seq = ring.write_seq
+            if seq == 0 or seq == self._topic_last_seq.get(topic):
+                return None
+            data = ring.read(seq)
+            if data is not None:
+                self._topic_last_seq[topic] = seq
+            return data
+
+        try:
+            return self._wait(read, timeout)
+        except Exception as e:
+            print(f"SHM PopLatest Error: {e}")
+            return None
+
+    def trim(self, topic: str, size: int):
+        """Limit retained messages (DURABLE readers skip anything older)"""
+        self._ring(topic).set_limit(size)
+
+    def queue_size(self, topic: str) -> int:
+        try:
+            return self._ring(topic).backlog()
+        except Exception:
+            return 0
+
+    def _segment_names(self):
+        try:
+            return [name for name in os.listdir(_SHM_DIR) if name.startswith(f"{self.prefix}-")]
+        except FileNotFoundError:
+            return []
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {}
+        for name in self._segment_names():
+            try:
+                shm = _attach_untracked(name)
+                try:
+                    magic, _, _, _, _, topic = _HEADER.unpack_from(shm.buf, 0)
+                finally:
+                    shm.close()
+                if magic != _MAGIC:
+                    continue
+                ring = self._ring(topic.rstrip(b'\x00').decode('utf-8', errors='ignore'))
+                stats[ring.topic] = {"current": ring.backlog(), "max": ring.window}
+            except Exception as e:
+                print(f"SHM Stats Error: {e}")
+        return stats
+
+    def unlink(self, topic: str):
+        """Remove a topic segment (other processes keep their mapping until they close it)"""
+        ring = self._rings.pop(topic, None)
+        if ring is not None:
+            ring.close()
+        self._unlink_segment(self._segment_name(topic))
+
+    @staticmethod
+    def _unlink_segment(name):
+        # SharedMemory.unlink() re-unregisters with the tracker before 3.13, so remove the file directly
+        try:
+            os.unlink(os.path.join(_SHM_DIR, name))
+        except FileNotFoundError:
+            pass
+        try:
+            os.unlink(os.path.join(tempfile.gettempdir(), f"{name}.lock"))
+        except FileNotFoundError:
+            pass
+
+    def reset(self):
+        """Remove all segments of this prefix (called once by the main process on startup)"""
+        for ring in self._rings.values():
+            ring.close()
+        self._rings.clear()
+        self._topic_last_seq.clear()
+        names = self._segment_names()
+        for name in names:
+            self._unlink_segment(name)
+        print(f"🧹 [SHM] System Reset: {len(names)} segment(s) removed")
+
+    # ========== Serialization Protocol ==========
+
+    def to_config(self) -> dict:
+        return {
+            "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
+            "prefix": self.prefix,
+            "slots": self.slots,
+            "slot_size": self.slot_size
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'SharedMemoryBroker':
+        return cls(
+            prefix=config.get("prefix", "edgeflow"),
+            slots=config.get("slots", 8),
+            slot_size=config.get("slot_size", 4 * 1024 * 1024)
+        )
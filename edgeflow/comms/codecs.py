@@ -0,0 +1,402 @@
+#edgeflow/comms/codecs.py
+"""
+Payload Codec Registry
+- 링크별로 페이로드 코덱을 선택 (예: sys.link(cam).to(gpu, codec="png"))
+- 코덱 ID는 Frame 고정 헤더에 기록되어 수신측이 추측 없이 디코딩
+- Spec 문자열: "jpeg", "jpeg:70", "png:3", "webp:80", "raw", "raw+zlib:1", "raw+lz4", "struct"
+"""
+import json
+import struct
+import zlib
+import numpy as np
+import cv2
+from .packing import pack_value, unpack_value
+
+
+class Codec:
+    """
+    모든 코덱의 기본 클래스
+    - encode(data, offset): 페이로드를 버퍼 리스트로 변환 (offset = 패킷 내 페이로드 시작 위치)
+    - decode(buf, offset): buf[offset:]의 페이로드를 복원
+    """
+    codec_id = None
+    name = None
+    lossless = True
+    cacheable = True  # 같은 프레임의 인코딩 결과를 여러 링크가 재사용 가능한지 여부
+    zero_copy = False  # True: 수신 패킷 위의 뷰로 복원 (디코딩 비용 없음 -> Frame이 지연 없이 바로 복원)
+
+    def __init__(self, param=None):
+        self.param = param
+
+    @property
+    def spec(self):
+        """링크 설정/환경변수로 전달 가능한 문자열 표현"""
+        return self.name if self.param is None else f"{self.name}:{self.param}"
+
+    def accepts(self, data):
+        """이 코덱으로 인코딩 가능한 데이터인지 여부 (불가능하면 Frame이 raw로 대체)"""
+        return isinstance(data, np.ndarray)
+
+    def encode(self, data, offset=0):
+        raise NotImplementedError
+
+    def decode(self, buf, offset=0):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<Codec {self.spec}>"
+
+
+class EncodedCodec(Codec):
+    """불투명 bytes (사용자가 직접 직렬화한 데이터, 수신 시 그대로 전달)"""
+    codec_id = 0
+    name = "encoded"
+    lossless = False
+
+    def accepts(self, data):
+        return isinstance(data, (bytes, bytearray, memoryview))
+
+    def encode(self, data, offset=0):
+        return [data]
+
+    def decode(self, buf, offset=0):
+        # 사용자 데이터이므로 bytes로 반환 (.decode() 등 bytes API 그대로 사용 가능)
+        return bytes(buf[offset:])
+
+
+class RawCodec(Codec):
+    """
+    Raw Tensor (코덱 생략)
+    [Tensor Header] dtype_len(B) + dtype(str) + ndim(B) + shape(Q*n) + strides(q*n) + pad_len(B) + pad
+    - dtype: dtype.str (예: '<f4', '<M8[ns]'), 구조화 / 하위 배열 dtype은 dtype_len = 0 + len(H) + JSON 명세
+    - raw 데이터는 패킷 시작 기준 ALIGN 바이트 정렬 -> 수신측 np 뷰가 정렬된 메모리를 가리킴
+    - 수신 시 읽기 전용 ndarray 뷰 반환 (복사 없음)
+    """
+    codec_id = 1
+    name = "raw"
+    cacheable = False  # 인코딩 비용 없음 + 정렬 패딩이 패킷 내 위치에 의존
+    zero_copy = True
+    ALIGN = 16
+
+    def accepts(self, data):
+        return isinstance(data, np.ndarray) and not data.dtype.hasobject
+
+    @staticmethod
+    def _bytes(arr):
+        """연속 배열의 메모리 -> 1차원 바이트 뷰 (datetime64 / 구조화 dtype은 버퍼 export 불가 -> uint8로 재해석)"""
+        return memoryview(arr.reshape(-1).view(np.uint8))
+
+    @classmethod
+    def _contiguous(cls, arr):
+        """C/F 연속 배열은 메모리 그대로 (strides 보존), 그 외 뷰는 연속 배열로 정리"""
+        if arr.flags.c_contiguous:
+            return arr, cls._bytes(arr) if arr.ndim and arr.size else arr.tobytes()
+        if arr.flags.f_contiguous:
+            return arr, cls._bytes(arr.T)
+        arr = np.ascontiguousarray(arr)
+        return arr, cls._bytes(arr)
+
+    @staticmethod
+    def _pack_descriptor(arr):
+        dtype_str = _dtype_bytes(arr.dtype)
+        ndim = arr.ndim
+        return struct.pack(
+            f'!{len(dtype_str)}sB{ndim}Q{ndim}q',
+            dtype_str, ndim, *arr.shape, *arr.strides
+        )
+
+    @staticmethod
+    def _unpack_descriptor(buf, offset):
+        """-> (dtype, shape, strides, 다음 offset)"""
+        dtype, offset = _dtype_from_bytes(buf, offset)
+        ndim = buf[offset]
+        offset += 1
+        dims = struct.unpack_from(f'!{ndim}Q{ndim}q', buf, offset)
+        return dtype, dims[:ndim], dims[ndim:], offset + 16 * ndim
+
+    def encode(self, data, offset=0):
+        arr, raw = self._contiguous(data)
+        desc = self._pack_descriptor(arr)
+        pad = -(offset + len(desc) + 1) % self.ALIGN
+        return [desc, bytes([pad]) + b'\x00' * pad, raw]
+
+    def decode(self, buf, offset=0):
+        dtype, shape, strides, offset = self._unpack_descriptor(buf, offset)
+        offset += 1 + buf[offset]  # 정렬 패딩 건너뛰기
+        arr = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset, strides=strides)
+        arr.flags.writeable = False
+        return arr
+
+
+def _dtype_spec(dtype):
+    """dtype -> JSON 호환 명세 (구조화: names/formats/offsets/itemsize, 하위 배열: [base, shape])"""
+    if dtype.fields is not None:
+        return {
+            "names": list(dtype.names),
+            "formats": [_dtype_spec(dtype.fields[name][0]) for name in dtype.names],
+            "offsets": [dtype.fields[name][1] for name in dtype.names],
+            "itemsize": dtype.itemsize,
+        }
+    if dtype.subdtype is not None:
+        base, shape = dtype.subdtype
+        return [_dtype_spec(base), list(shape)]
+    return dtype.str
+
+
+def _dtype_from_spec(spec):
+    if isinstance(spec, dict):
+        return np.dtype({**spec, "formats": [_dtype_from_spec(f) for f in spec["formats"]]})
+    if isinstance(spec, list):
+        return np.dtype((_dtype_from_spec(spec[0]), tuple(spec[1])))
+    return np.dtype(spec)
+
+
+def _dtype_bytes(dtype):
+    """Tensor Header의 dtype 필드 (일반 dtype은 dtype.str 그대로 -> 기존 패킷과 호환)"""
+    if dtype.fields is None and dtype.subdtype is None:
+        dtype_str = dtype.str.encode('ascii')
+        return bytes([len(dtype_str)]) + dtype_str
+    spec = json.dumps(_dtype_spec(dtype), separators=(',', ':')).encode('utf-8')
+    return b'\x00' + struct.pack('!H', len(spec)) + spec
+
+
+def _dtype_from_bytes(buf, offset):
+    """-> (dtype, 다음 offset)"""
+    dtype_len = buf[offset]
+    offset += 1
+    if dtype_len:
+        return np.dtype(bytes(buf[offset:offset + dtype_len]).decode('ascii')), offset + dtype_len
+    spec_len = struct.unpack_from('!H', buf, offset)[0]
+    offset += 2
+    return _dtype_from_spec(json.loads(bytes(buf[offset:offset + spec_len]))), offset + spec_len
+
+
+class StructCodec(RawCodec):
+    """
+    구조화 페이로드 (스칼라 + ndarray가 섞인 중첩 dict/list, 예: LiDAR {"angle": ..., "raw_points": ndarray})
+    [Layout] n_arrays(I) + [Tensor Header + offset(Q) + nbytes(Q)] * n + skeleton_len(I) + skeleton + 정렬된 배열 버퍼들
+    - skeleton: packing.py 바이너리 포맷 (배열 자리에는 인덱스만 기록)
+    - 배열 버퍼는 패킷 시작 기준 ALIGN 정렬 -> 수신 시 읽기 전용 ndarray 뷰 (복사 없음)
+    """
+    codec_id = 7
+    name = "struct"
+    _COUNT = struct.Struct('!I')
+    _RANGE = struct.Struct('!QQ')
+
+    def accepts(self, data):
+        return isinstance(data, (dict, list, tuple))
+
+    def encode(self, data, offset=0):
+        skeleton, arrays = [], []
+        pack_value(data, skeleton, arrays)
+        skeleton = b''.join(skeleton)
+        buffers = [self._contiguous(arr) for arr in arrays]
+        descs = [self._pack_descriptor(arr) for arr, _ in buffers]
+
+        # 배열 버퍼 시작 위치 (페이로드 기준) = 테이블 + skeleton 뒤
+        pos = 4 + sum(len(desc) + self._RANGE.size for desc in descs) + 4 + len(skeleton)
+        table, body = [self._COUNT.pack(len(arrays))], []
+        for desc, (_, raw) in zip(descs, buffers):
+            pad = -(offset + pos) % self.ALIGN
+            if pad:
+                body.append(b'\x00' * pad)
+                pos += pad
+            table.append(desc + self._RANGE.pack(pos, len(raw)))
+            body.append(raw)
+            pos += len(raw)
+
+        return [*table, self._COUNT.pack(len(skeleton)), skeleton, *body]
+
+    def decode(self, buf, offset=0):
+        base = offset
+        count = self._COUNT.unpack_from(buf, offset)[0]
+        offset += 4
+        arrays = []
+        for _ in range(count):
+            dtype, shape, strides, offset = self._unpack_descriptor(buf, offset)
+            start, _ = self._RANGE.unpack_from(buf, offset)
+            offset += self._RANGE.size
+            arr = np.ndarray(shape, dtype=dtype, buffer=buf, offset=base + start, strides=strides)
+            arr.flags.writeable = False
+            arrays.append(arr)
+        return unpack_value(buf, offset + 4, arrays)[0]
+
+
+class _CompressedRawCodec(RawCodec):
+    """Raw Tensor + 범용 압축 (무손실, 대역폭이 좁은 링크용)"""
+    cacheable = True
+    zero_copy = False
+
+    def _compress(self, raw):
+        raise NotImplementedError
+
+    def _decompress(self, buf):
+        raise NotImplementedError
+
+    def encode(self, data, offset=0):
+        arr, raw = self._contiguous(data)
+        return [self._pack_descriptor(arr), self._compress(raw)]
+
+    def decode(self, buf, offset=0):
+        dtype, shape, strides, offset = self._unpack_descriptor(buf, offset)
+        raw = self._decompress(buf[offset:])
+        arr = np.ndarray(shape, dtype=dtype, buffer=raw, strides=strides)
+        arr.flags.writeable = False
+        return arr
+
+
+class ZlibRawCodec(_CompressedRawCodec):
+    """raw+zlib[:level] (기본 level=1, 속도 우선)"""
+    codec_id = 5
+    name = "raw+zlib"
+
+    def _compress(self, raw):
+        return zlib.compress(raw, 1 if self.param is None else int(self.param))
+
+    def _decompress(self, buf):
+        return zlib.decompress(buf)
+
+
+class Lz4RawCodec(_CompressedRawCodec):
+    """raw+lz4 (lz4 패키지 필요)"""
+    codec_id = 6
+    name = "raw+lz4"
+
+    def __init__(self, param=None):
+        super().__init__(param)
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ImportError("Codec 'raw+lz4' requires the lz4 package (pip install lz4)")
+        self._lz4 = lz4.frame
+
+    def _compress(self, raw):
+        return self._lz4.compress(raw)
+
+    def _decompress(self, buf):
+        return self._lz4.decompress(buf)
+
+
+class _ImageCodec(Codec):
+    """cv2 이미지 코덱 공통 로직"""
+    ext = None
+    read_flag = cv2.IMREAD_COLOR
+    depths = (np.uint8,)
+
+    def _params(self):
+        return []
+
+    def accepts(self, arr):
+        if not isinstance(arr, np.ndarray) or arr.dtype not in self.depths or arr.size == 0:
+            return False
+        return arr.ndim == 2 or (arr.ndim == 3 and arr.shape[2] in (1, 3, 4))
+
+    def encode(self, data, offset=0):
+        success, buf = cv2.imencode(self.ext, data, self._params())
+        if not success:
+            raise ValueError(f"cv2.imencode failed for codec '{self.spec}'")
+        return [buf]
+
+    def decode(self, buf, offset=0):
+        payload = buf[offset:]
+        img = cv2.imdecode(np.frombuffer(payload, np.uint8), self.read_flag)
+        return payload if img is None else img
+
+
+class JpegCodec(_ImageCodec):
+    """jpeg[:quality] (기본 quality=95, cv2 기본값)"""
+    codec_id = 2
+    name = "jpeg"
+    ext = ".jpg"
+    lossless = False
+
+    def _params(self):
+        return [] if self.param is None else [cv2.IMWRITE_JPEG_QUALITY, int(self.param)]
+
+
+class PngCodec(_ImageCodec):
+    """png[:compression] (무손실, uint16 Depth 지원, 채널 수 그대로 복원)"""
+    codec_id = 3
+    name = "png"
+    ext = ".png"
+    read_flag = cv2.IMREAD_UNCHANGED
+    depths = (np.uint8, np.uint16)
+
+    def _params(self):
+        return [] if self.param is None else [cv2.IMWRITE_PNG_COMPRESSION, int(self.param)]
+
+
+class WebpCodec(_ImageCodec):
+    """webp[:quality] (quality > 100이면 무손실)"""
+    codec_id = 4
+    name = "webp"
+    ext = ".webp"
+    lossless = False
+
+    def _params(self):
+        return [] if self.param is None else [cv2.IMWRITE_WEBP_QUALITY, int(self.param)]
+
+
+# ========== Registry ==========
+
+_REGISTRY = {}      # name -> Codec class
+_REGISTRY_IDS = {}  # codec_id -> Codec class
+_DECODERS = {}      # codec_id -> 디코딩용 기본 인스턴스 (파라미터 불필요)
+
+DEFAULT_CODEC = "jpeg"
+
+
+def register_codec(cls):
+    """코덱 클래스 등록 (데코레이터로도 사용 가능)"""
+    existing = _REGISTRY_IDS.get(cls.codec_id)
+    if existing is not None and existing is not cls:
+        raise ValueError(f"Codec id {cls.codec_id} already registered by '{existing.name}'")
+    _REGISTRY[cls.name] = cls
+    _REGISTRY_IDS[cls.codec_id] = cls
+    _DECODERS.pop(cls.codec_id, None)
+    return cls
+
+
+def get_codec(spec=None):
+    """Spec 문자열 / Codec 인스턴스 / None(기본 코덱) -> Codec 인스턴스"""
+    if isinstance(spec, Codec):
+        return spec
+    name, _, param = (spec or DEFAULT_CODEC).partition(':')
+    try:
+        cls = _REGISTRY[name.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown codec '{spec}' (available: {', '.join(sorted(_REGISTRY))})")
+    return cls(param.strip() or None)
+
+
+# 이미 인코딩된 이미지 bytes의 시그니처 -> 코덱 ID (송신측에서 한 번만 판별, 수신측은 추측하지 않음)
+_SIGNATURES = (
+    (b'\xff\xd8\xff', JpegCodec.codec_id),
+    (b'\x89PNG\r\n\x1a\n', PngCodec.codec_id),
+)
+
+
+def sniff_codec(data):
+    """이미 인코딩된 bytes -> 해당 이미지 코덱 (JPEG/PNG/WebP), 모르는 형식은 EncodedCodec"""
+    head = bytes(data[:12])
+    for signature, codec_id in _SIGNATURES:
+        if head.startswith(signature):
+            return codec_from_id(codec_id)
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return codec_from_id(WebpCodec.codec_id)
+    return codec_from_id(EncodedCodec.codec_id)
+
+
+def codec_from_id(codec_id):
+    """헤더의 코덱 ID -> 디코딩용 Codec 인스턴스"""
+    codec = _DECODERS.get(codec_id)
+    if codec is None:
+        try:
+            codec = _DECODERS[codec_id] = _REGISTRY_IDS[codec_id]()
+        except KeyError:
+            raise ValueError(f"Unknown codec id {codec_id}")
+    return codec
+
+
+for _cls in (EncodedCodec, RawCodec, JpegCodec, PngCodec, WebpCodec, ZlibRawCodec, Lz4RawCodec, StructCodec):
+    register_codec(_cls)
@@ -1,124 +1,447 @@
 #edgeflow/comms/frame.py
+import os
 import time
 import struct
 import json
+import zlib
+from collections import namedtuple
+from functools import lru_cache
+from array import array
+from contextlib import contextmanager
 import numpy as np
-import cv2
+from .codecs import get_codec, codec_from_id, sniff_codec, EncodedCodec, JpegCodec, RawCodec, StructCodec
+from .packing import pack_meta, unpack_meta
+from ..config import settings
 
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, (np.int_, np.intc, np.intp, np.int8,
-                            np.int16, np.int32, np.int64, np.uint8,
-                            np.uint16, np.uint32, np.uint64)):
+        if isinstance(obj, np.integer):
             return int(obj)
-        elif isinstance(obj, (np.float_, np.float16, np.float32, np.float64)):
+        elif isinstance(obj, np.floating):
             return float(obj)
+        elif isinstance(obj, np.bool_):
+            return bool(obj)
         elif isinstance(obj, (np.ndarray,)):
             return obj.tolist()
         return json.JSONEncoder.default(self, obj)
 
+
+# ========== Wire Format (v2) ==========
+# [Fixed Header] 43 bytes, 모든 필드가 고정 오프셋 -> Gateway/Broker가 메타 파싱 없이 라우팅/드롭 가능
+#   magic(2s) + version(B) + codec_id(B) + flags(B) + trace_mask(B)
+#   + frame_id(Q) + epoch(I) + topic_id(I) + timestamp(d) + deadline(d) + topic_len(B) + meta_len(I)
+# - codec_id: 페이로드 타입/코덱 (codecs.py 레지스트리) -> 수신측이 추측 없이 디코딩 방식 결정
+# - flags: FLAG_META_BINARY면 바이너리 메타, 아니면 JSON (하위 호환 / 디버깅용)
+# - trace_mask: 기록된 Trace 슬롯 비트마스크 -> 토픽 뒤에 해당 슬롯의 ns 타임스탬프(Q)가 순서대로 이어짐
+# - epoch: 송신 프로세스별 랜덤 ID -> 재시작 후 frame_id가 다시 0부터 시작해도 (epoch, frame_id)는 충돌하지 않음
+# - topic_id: 토픽 이름의 CRC32 (0 = 토픽 없음), deadline: 만료 시각 (Unix time, 0 = 무제한)
+# [Packet] Fixed Header + Topic(utf-8) + Trace(Q * popcount) + Meta + Payload
+_HEADER = struct.Struct('!2sBBBBQIIddBI')
+
+WIRE_MAGIC = b'EF'
+WIRE_VERSION = 2
+
+FLAG_META_BINARY = 0x01
+
+# 이 프로세스가 생성한 프레임의 epoch (프로세스 재시작마다 새로 발급)
+PRODUCER_EPOCH = int.from_bytes(os.urandom(4), 'big')
+
+
+def _renew_producer_epoch():
+    """fork된 노드 프로세스는 부모의 epoch를 물려받음 -> 자식마다 새로 발급"""
+    global PRODUCER_EPOCH
+    PRODUCER_EPOCH = int.from_bytes(os.urandom(4), 'big')
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_renew_producer_epoch)
+
+class FrameHeader(namedtuple('FrameHeader', [
+    'version', 'codec_id', 'flags', 'trace_mask', 'frame_id', 'epoch',
+    'topic_id', 'timestamp', 'deadline', 'topic', 'meta_len', 'body_offset'
+])):
+    """Frame.peek_header() 결과 (메타/페이로드 파싱 없이 읽은 고정 헤더)"""
+    __slots__ = ()
+
+    def expired(self, max_age=None, now=None):
+        """deadline이 지났거나 timestamp 기준 max_age(초)보다 오래된 프레임인지 여부"""
+        now = time.time() if now is None else now
+        if self.deadline and now > self.deadline:
+            return True
+        return bool(max_age) and now - self.timestamp > max_age
+
+
+@lru_cache(maxsize=1024)
+def _topic_field(topic):
+    """토픽 이름 -> (utf-8 bytes, CRC32 토픽 ID)"""
+    if not topic:
+        return b'', 0
+    raw = topic.encode('utf-8')
+    if len(raw) > 255:
+        raise ValueError(f"Topic name too long for frame header: '{topic}'")
+    return raw, zlib.crc32(raw)
+
+
+def topic_id(topic):
+    """토픽 이름 -> 헤더에 기록되는 토픽 ID"""
+    return _topic_field(topic)[1]
+
+# ========== Latency Trace ==========
+# 고정 슬롯 Trace: 단계 이름 -> 슬롯 번호 (최대 8개, 헤더의 trace_mask 1 byte)
+# 등록되지 않은 단계 이름은 meta['trace']에 기록 (하위 호환)
+TRACE_STAGES = ('t0', 'encoded', 'sent', 'received', 'decoded', 'processed', 'forwarded', 'gateway_in')
+_TRACE_SLOTS = {name: i for i, name in enumerate(TRACE_STAGES)}
+_TRACE_EMPTY = array('Q', bytes(8 * len(TRACE_STAGES)))
+_TRACE_ITEM = struct.Struct('!Q')
+
+
+def _pack_trace(trace):
+    """Trace 배열 -> (mask, 기록된 슬롯 bytes)"""
+    mask = 0
+    values = []
+    for i, ts in enumerate(trace):
+        if ts:
+            mask |= 1 << i
+            values.append(ts)
+    return mask, struct.pack(f'!{len(values)}Q', *values)
+
+
+def _unpack_trace(mask, buf, offset):
+    """헤더의 mask + 슬롯 bytes -> (Trace 배열, 다음 offset)"""
+    trace = array('Q', _TRACE_EMPTY)
+    for i in range(len(TRACE_STAGES)):
+        if mask & (1 << i):
+            trace[i] = _TRACE_ITEM.unpack_from(buf, offset)[0]
+            offset += 8
+    return trace, offset
+
+# [Lazy Decoding] 수신 후 아직 디코딩하지 않은 페이로드 표시용 센티널
+_UNDECODED = object()
+
+# MJPEG 스트리밍에 그대로 내보낼 수 있는 코덱 (재인코딩 불필요)
+_MJPEG_CODEC_IDS = (EncodedCodec.codec_id, JpegCodec.codec_id)
+
+
 class Frame:
     """
     EdgeFlow 데이터 전송 표준 객체
     - Numpy(이미지)와 Bytes(전송 데이터) 상태를 모두 처리 가능
+    - dict/list 구조화 페이로드 (스칼라 + ndarray, 예: LiDAR/IMU)는 StructCodec으로 전송
     - Gateway 성능 최적화를 위한 avoid_decode 옵션 지원
+    - codec: 페이로드 코덱 (None이면 링크 설정 또는 기본 JPEG, 예: "raw", "png", "jpeg:70")
+    - Lazy Decoding: 수신 페이로드는 data 최초 접근 시에만 디코딩 (메타만 읽는 노드는 디코딩 비용 없음)
+    - meta_format: "binary"(기본, ndarray 그대로 전송) 또는 "json" (EDGEFLOW_META_FORMAT 환경변수)
+      binary 수신 메타의 ndarray는 패킷 위 읽기 전용 뷰 (제자리 수정은 .copy() 후)
+    - trace: 고정 슬롯 Latency Trace (TRACE_STAGES 순서의 ns 타임스탬프 배열, 0 = 미기록)
+    - (epoch, frame_id): 프로세스 재시작에도 충돌하지 않는 프레임 식별자 (Broker 키 등에 사용)
     """
-    def __init__(self, frame_id=0, timestamp=0.0, meta=None, data=None):
+    # 고빈도 센서 토픽(200Hz+)에서 프레임당 할당을 줄이기 위해 __dict__ 없이 슬롯만 사용
+    __slots__ = ('frame_id', 'timestamp', 'meta', 'codec', 'trace', 'epoch', 'topic', 'deadline',
+                 '_data', '_payload', '_payload_codec', '_encoded')
+
+    meta_format = settings.META_FORMAT
+
+    def __init__(self, frame_id=0, timestamp=0.0, meta=None, data=None, codec=None, trace=None,
+                 topic=None, deadline=0.0, epoch=None):
         self.frame_id = frame_id
         self.timestamp = timestamp
-        self.meta = meta or {}
-        
-        # [Latency Tracking] 생성 시점 기록
-        if 'trace' not in self.meta:
-            self.meta['trace'] = {}
-        if 't0' not in self.meta['trace']:
-            self.mark('t0')
+        self.meta = meta if meta is not None else {}
+        self.codec = codec
+        self.topic = topic        # 헤더의 라우팅 토픽 (수신 프레임은 송신측 링크 토픽)
+        self.deadline = deadline  # 만료 시각 (Unix time, 0 = 무제한)
+        self.epoch = PRODUCER_EPOCH if epoch is None else epoch
+        self._encoded = None  # [Fan-out] encode_once() 블록 동안의 인코딩 결과 캐시
+
+        # [Latency Tracking] 새 프레임만 생성 시점 기록 (수신 프레임은 헤더의 Trace를 그대로 사용)
+        if trace is None:
+            trace = array('Q', _TRACE_EMPTY)
+            trace[0] = time.time_ns()
+        self.trace = trace
 
         self.data = data  # 타입: numpy.ndarray(이미지) 또는 bytes(인코딩됨)
 
+    @property
+    def data(self):
+        """페이로드 (수신 프레임은 최초 접근 시 디코딩 후 캐시)"""
+        if self._data is _UNDECODED:
+            self._data = self._decode_payload()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._payload = None  # 데이터가 교체되면 원본 인코딩 bytes는 더 이상 유효하지 않음
+        self._payload_codec = None
+
+    @property
+    def is_decoded(self):
+        """페이로드가 디코딩(또는 직접 할당)된 상태인지 여부"""
+        return self._data is not _UNDECODED
+
+    def _decode_payload(self):
+        """[Internal] 보관 중인 인코딩 bytes -> 헤더의 코덱으로 복원"""
+        payload = self._payload
+        if not payload:
+            return payload
+
+        data = self._payload_codec.decode(payload)
+
+        # 쓰기 가능한 배열 / 구조화 페이로드(dict, list)는 사용자가 제자리 수정할 수 있으므로 원본 bytes 재사용 불가
+        if isinstance(data, (dict, list)) or (isinstance(data, np.ndarray) and data.flags.writeable):
+            self._payload = None
+            self._payload_codec = None
+        return data
+
     def mark(self, step_name):
-        """현재 시간을 기록 (타임스탬프)"""
-        self.meta['trace'][step_name] = time.time()
+        """현재 시간을 기록 (TRACE_STAGES 단계는 고정 슬롯, 그 외는 meta['trace'])"""
+        slot = _TRACE_SLOTS.get(step_name)
+        if slot is not None:
+            self.trace[slot] = time.time_ns()
+        else:
+            self.meta.setdefault('trace', {})[step_name] = time.time()
+
+    def get_trace(self):
+        """기록된 단계 -> 타임스탬프(초) dict (고정 슬롯 + meta['trace'] 사용자 단계)"""
+        trace = {name: ts / 1e9 for name, ts in zip(TRACE_STAGES, self.trace) if ts}
+        extra = self.meta.get('trace')
+        if isinstance(extra, dict):
+            trace.update(extra)
+        return trace
 
     def analyze_latency(self):
         """지연 시간 분석 결과 반환 (ms 단위)"""
-        trace = self.meta['trace']
-        t0 = trace.get('t0', time.time())
-        current = trace.get('gateway_in', time.time())
-        
+        now = time.time_ns()
+        t0 = self.trace[0] or now
+        current = self.trace[_TRACE_SLOTS['gateway_in']] or now
+
         return {
-            "total": (current - t0) * 1000,
-            "breakdown": trace
+            "total": (current - t0) / 1e6,
+            "breakdown": self.get_trace()
         }
 
+    # deadline / max_age 만료 판단 (in-process 브로커로 받은 Frame은 헤더 없이 바로 검사)
+    expired = FrameHeader.expired
+
+    def routed(self, topic=None):
+        """
+        [In-Process] 같은 data/payload를 공유하는 얕은 복사본 (토픽/메타/Trace만 분리)
+        - 직렬화 없이 Frame을 그대로 넘기는 브로커(MemoryBroker)용: 수신측 mark()가 송신 프레임에 섞이지 않음
+        - 공유 배열은 읽기 전용 뷰로 전달: 한 구독자의 제자리 수정이 송신측 / 다른 구독자 프레임을 오염시키지 않음
+          (수정이 필요하면 사본 사용, ConsumerNode.loop(data)는 자동으로 사본을 받음)
+        """
+        frame = Frame.__new__(Frame)
+        for name in Frame.__slots__:
+            setattr(frame, name, getattr(self, name))
+        data = self._data
+        if isinstance(data, np.ndarray) and data.flags.writeable:
+            frame._data = data.view()
+            frame._data.flags.writeable = False
+        frame.meta = dict(self.meta)
+        frame.trace = array('Q', self.trace)
+        frame.topic = topic or self.topic
+        frame._encoded = None
+        return frame
+
+    @staticmethod
+    def peek_header(buf):
+        """
+        패킷의 고정 헤더 + 토픽만 파싱 (메타/페이로드는 건드리지 않음)
+        :return: FrameHeader 또는 None (길이 부족 / 다른 프로토콜 버전)
+        """
+        if not buf or len(buf) < _HEADER.size:
+            return None
+        (magic, version, codec_id, flags, trace_mask, f_id, epoch,
+         t_id, ts, deadline, topic_len, meta_len) = _HEADER.unpack_from(buf)
+        if magic != WIRE_MAGIC or version != WIRE_VERSION:
+            return None
+        body_offset = _HEADER.size + topic_len
+        topic = bytes(buf[_HEADER.size:body_offset]).decode('utf-8') if topic_len else None
+        return FrameHeader(version, codec_id, flags, trace_mask, f_id, epoch,
+                           t_id, ts, deadline, topic, meta_len, body_offset)
+
     @classmethod
     def from_bytes(cls, raw_bytes, avoid_decode=False):
         """
-        네트워크 패킷(Bytes) -> Frame 객체 변환
+        네트워크 패킷(bytes / bytearray / memoryview) -> Frame 객체 변환
         :param avoid_decode: True일 경우 이미지 디코딩을 건너뛰고 bytes 상태로 유지 (Gateway용)
+        - 페이로드는 패킷 위의 memoryview로 보관 (슬라이스 복사 없음)
+        - Frame 객체(in-process 브로커)는 그대로 반환
         """
-        # 헤더 최소 길이(16 bytes) 체크
-        if not raw_bytes or len(raw_bytes) < 16:
+        if isinstance(raw_bytes, Frame):
+            return raw_bytes
+
+        # 헤더 최소 길이(43 bytes) + magic/version 체크
+        header = Frame.peek_header(raw_bytes)
+        if header is None:
+            if raw_bytes and len(raw_bytes) >= _HEADER.size:
+                print(f"[Frame Error] Unsupported wire format (expected {WIRE_MAGIC!r} v{WIRE_VERSION})")
             return None
         
         try:
-            # 1. 고정 헤더 파싱 (Frame ID, Timestamp) - 12 bytes
-            f_id, ts = struct.unpack('!Id', raw_bytes[:12])
-            
-            # 2. 메타데이터 길이 파싱 - 4 bytes
-            json_len = struct.unpack('!I', raw_bytes[12:16])[0]
-            
-            # 3. 메타데이터 바디 파싱
-            meta_end_idx = 16 + json_len
-            meta_bytes = raw_bytes[16:meta_end_idx]
-            meta = json.loads(meta_bytes.decode('utf-8'))
+            # [Zero-Copy] 이후 모든 슬라이스는 원본 패킷 버퍼를 공유
+            buf = memoryview(raw_bytes)
+
+            # 1. 고정 헤더 (Codec ID, Flags, Trace, 토픽 등) - 43 bytes + 토픽
+            codec = codec_from_id(header.codec_id)
+            trace, meta_start = _unpack_trace(header.trace_mask, buf, header.body_offset)
             
+            # 2. 메타데이터 바디 파싱 (바이너리 / JSON)
+            meta_end_idx = meta_start + header.meta_len
+            if header.flags & FLAG_META_BINARY:
+                meta = unpack_meta(buf, meta_start)
+            else:
+                meta = json.loads(bytes(buf[meta_start:meta_end_idx]))
+
+            # 수신 코덱을 유지 -> 그대로 재전송 시 같은 코덱 사용 (불투명 bytes는 기본 코덱으로)
+            frame_codec = None if codec.codec_id == EncodedCodec.codec_id else codec
+            fields = dict(frame_id=header.frame_id, timestamp=header.timestamp, meta=meta,
+                          codec=frame_codec, trace=trace, topic=header.topic,
+                          deadline=header.deadline, epoch=header.epoch)
+
+            # 3. [Raw Tensor / Struct] 패킷 위의 np 뷰로 복원 (avoid_decode와 무관하게 복사 비용 없음)
+            if codec.zero_copy:
+                payload = codec.decode(buf, meta_end_idx)
+                return cls(data=payload, **fields)
+
             # 4. 데이터 페이로드 추출
-            payload = raw_bytes[meta_end_idx:]
+            payload = buf[meta_end_idx:]
+            frame = cls(data=payload, **fields)
 
-            # [핵심 로직] 디코딩 여부 결정
-            # payload가 있고, avoid_decode가 False일 때만 Numpy로 변환
+            # [핵심 로직] 디코딩 지연
+            # avoid_decode가 False면 data 최초 접근 시 Numpy로 변환 (그 전까지는 원본 bytes 보관)
+            # 원본 bytes는 프레임을 그대로 재전송할 때 재인코딩 없이 사용됨
+            frame._payload = payload
+            frame._payload_codec = codec
             if not avoid_decode and len(payload) > 0:
-                # 이미지 데이터라고 가정하고 디코딩 시도
-                nparr = np.frombuffer(payload, np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                # 디코딩 성공 시 Numpy 배열로 교체, 실패 시 bytes 유지(일반 데이터일 수 있음)
-                if img is not None:
-                    payload = img
-                
-            return cls(frame_id=f_id, timestamp=ts, meta=meta, data=payload)
+                frame._data = _UNDECODED
+
+            return frame
             
         except Exception as e:
             # 상용에서는 로깅 필요 (print는 디버깅용)
             print(f"[Frame Error] Deserialization failed: {e}")
             return None
 
-    def to_bytes(self):
-        """Frame 객체 -> 네트워크 패킷(Bytes) 변환"""
-        data_bytes = b""
-
-        # 1. 데이터 타입 처리
-        if isinstance(self.data, np.ndarray):
-            success, buf = cv2.imencode('.jpg', self.data)
-            if success:
-                data_bytes = buf.tobytes()
-        elif isinstance(self.data, bytes):
-            data_bytes = self.data
-        
-        # 2. 메타데이터 직렬화 (cls=NumpyEncoder 추가!)
-        # AI 결과값(score 등)이 Numpy 타입이어도 에러가 안 나게 처리
-        meta_bytes = json.dumps(self.meta, cls=NumpyEncoder).encode('utf-8')
-        
-        # 3. 헤더 패킹 (강제 형변환 적용 확인됨 ✅)
-        header = struct.pack('!Id', int(self.frame_id), float(self.timestamp))
-        meta_len_header = struct.pack('!I', len(meta_bytes))
+    @contextmanager
+    def encode_once(self):
+        """
+        블록 안의 to_bytes() 호출들이 같은 코덱의 인코딩 결과를 공유 (핸들러 fan-out용)
+        - 블록을 벗어나면 캐시 해제 (이후 data를 제자리 수정해도 안전)
+        """
+        if self._encoded is not None:  # 중첩 호출
+            yield self
+            return
+        self._encoded = {}
+        try:
+            yield self
+        finally:
+            self._encoded = None
+
+    def to_bytes(self, codec=None, topic=None):
+        """
+        Frame 객체 -> 네트워크 패킷(Bytes) 변환
+        :param codec: 링크별 코덱 (None이면 frame.codec -> 기본 JPEG 순으로 결정)
+        :param topic: 헤더에 기록할 라우팅 토픽 (None이면 frame.topic, frame은 수정하지 않음)
+        """
+        return b''.join(self.to_buffers(codec, topic))
+
+    def to_buffers(self, codec=None, topic=None):
+        """
+        Frame 객체 -> 패킷 버퍼 리스트 [head(헤더+토픽+Trace+메타), 페이로드 버퍼...]
+        - 이어 붙이지 않은 그대로 sendmsg / Redis 멀티파트 전송에 사용 (대용량 페이로드 복사 없음)
+        - 모든 버퍼는 bytes 또는 1차원 바이트 memoryview
+        """
+        # 1. 메타데이터 / Trace 직렬화 (바이너리 기본, JSON 폴백) - 링크와 무관하므로 fan-out 시 공유
+        meta_bytes, flags = self._meta_bytes()
+        trace_mask, trace_bytes = _pack_trace(self.trace)
+        topic_bytes, t_id = _topic_field(topic or self.topic)
+
+        # 2. 페이로드 인코딩 (raw 코덱 정렬을 위해 패킷 내 시작 위치 전달)
+        offset = _HEADER.size + len(topic_bytes) + len(trace_bytes) + len(meta_bytes)
+        codec, data_parts = self._encode_payload(codec or self.codec, offset)
         
-        return header + meta_len_header + meta_bytes + data_bytes
+        # 3. 헤더 패킹 (링크별로 달라지는 부분은 헤더 + 토픽뿐)
+        header = _HEADER.pack(
+            WIRE_MAGIC, WIRE_VERSION, codec.codec_id, flags, trace_mask,
+            int(self.frame_id), self.epoch, t_id, float(self.timestamp), float(self.deadline),
+            len(topic_bytes), len(meta_bytes)
+        )
+
+        head = b''.join([header, topic_bytes, trace_bytes, meta_bytes])
+        return [head, *(part if isinstance(part, bytes) else memoryview(part).cast('B') for part in data_parts)]
+
+    def _meta_bytes(self):
+        """[Internal] 메타데이터 직렬화 -> (bytes, 헤더 flags) (encode_once 블록 안에서는 캐시)"""
+        key = ('meta',)
+        if self._encoded is not None and key in self._encoded:
+            return self._encoded[key]
+
+        meta = self.meta
+        if self.meta_format == "json":
+            # AI 결과값(score 등)이 Numpy 타입이어도 에러가 안 나게 처리 (cls=NumpyEncoder)
+            result = json.dumps(meta, cls=NumpyEncoder).encode('utf-8'), 0
+        else:
+            result = pack_meta(meta), FLAG_META_BINARY
+
+        if self._encoded is not None:
+            self._encoded[key] = result
+        return result
+
+    def _encode_payload(self, codec, offset):
+        """[Internal] -> (실제 사용한 Codec, 페이로드 버퍼 리스트) (encode_once 블록 안에서는 캐시)"""
+        key = getattr(codec, 'spec', codec)
+        if self._encoded is not None and key in self._encoded:
+            return self._encoded[key]
+
+        codec, parts = self._encode_payload_uncached(codec, offset)
+
+        # raw 코덱은 인코딩 비용이 없고 정렬 패딩이 위치(offset)에 따라 달라지므로 캐시하지 않음
+        if self._encoded is not None and codec.cacheable:
+            self._encoded[key] = (codec, parts)
+        return codec, parts
+
+    def _encode_payload_uncached(self, codec, offset):
+        # [Pass-through] 수정되지 않은 수신 프레임 -> 원본 인코딩 bytes 재사용 (재인코딩 생략)
+        # 링크가 파라미터를 명시하면 (예: "jpeg:30" 저화질 프리뷰) 원본 파라미터를 알 수 없으므로 재인코딩
+        if self._payload is not None:
+            if codec is None:
+                return self._payload_codec, [self._payload]
+            requested = get_codec(codec)
+            if requested.param is None and requested.codec_id == self._payload_codec.codec_id:
+                return self._payload_codec, [self._payload]
+
+        data = self.data
+        if isinstance(data, np.ndarray):
+            codec = get_codec(codec)
+            # 코덱이 표현할 수 없는 배열(float Depth, uint16 등)은 raw로 자동 대체
+            if not codec.accepts(data):
+                codec = codec_from_id(RawCodec.codec_id)
+            return codec, codec.encode(data, offset)
+
+        # bytes(이미 인코딩된 데이터) -> 시그니처로 JPEG/PNG/WebP 태그, 그 외는 불투명 bytes
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return sniff_codec(data), [data]
+
+        # 구조화 페이로드 (LiDAR/IMU 등 dict/list + ndarray) -> 배열은 정렬된 원본 버퍼 그대로
+        if data is not None:
+            codec = codec_from_id(StructCodec.codec_id)
+            return codec, codec.encode(data, offset)
+        return codec_from_id(EncodedCodec.codec_id), []
 
     def get_data_bytes(self):
-        """WebInterface 등 외부 송출을 위해 순수 데이터만 Bytes로 반환"""
-        if isinstance(self.data, np.ndarray):
-            success, buf = cv2.imencode('.jpg', self.data)
-            return buf.tobytes() if success else b""
+        """WebInterface 등 외부 송출을 위해 순수 데이터만 반환 (MJPEG용 JPEG, 수신 패킷의 memoryview일 수 있음)"""
+        if self._payload is not None:
+            if self._payload_codec.codec_id in _MJPEG_CODEC_IDS:
+                return self._payload
+            # PNG/raw 등은 (avoid_decode 여부와 무관하게) 복원 후 JPEG로 변환
+            data = self._payload_codec.decode(self._payload)
+        else:
+            data = self.data
+
+        if isinstance(data, np.ndarray):
+            jpeg = get_codec("jpeg")
+            if not jpeg.accepts(data):
+                return b""
+            return jpeg.encode(data)[0].tobytes()
         
-        return self.data if isinstance(self.data, bytes) else b""
\ No newline at end of file
+        return data if isinstance(data, (bytes, memoryview)) else b""
\ No newline at end of file
@@ -0,0 +1,160 @@
+#edgeflow/comms/packing.py
+"""
+Binary Packing (태그 기반 바이너리 포맷)
+- Frame 메타데이터와 구조화 페이로드(StructCodec)가 공유
+- JSON + NumpyEncoder(tolist) 대신 사용: 스칼라는 네이티브 바이너리, ndarray는 dtype/shape + 원본 버퍼 그대로
+- arrays 리스트를 넘기면 ndarray는 인덱스만 기록하고 버퍼는 호출측이 따로 배치 (out-of-band)
+- 언팩된 ndarray는 수신 버퍼 위의 읽기 전용 뷰: 제자리 수정이 필요하면 .copy() 사용
+- dtype.str로 표현할 수 없는 배열 (구조화 / datetime64 / timedelta64)은 기본 타입으로 변환해 기록 (JSON 모드와 동일)
+"""
+import struct
+import numpy as np
+
+_T_NONE, _T_TRUE, _T_FALSE, _T_INT, _T_BIGINT, _T_FLOAT = b'N', b'T', b'F', b'i', b'I', b'd'
+_T_STR, _T_BYTES, _T_LIST, _T_DICT, _T_ARRAY, _T_ARRAY_REF = b's', b'b', b'l', b'm', b'a', b'A'
+
+# 언팩 시 buf[offset] (int)과 비교 -> bytes / memoryview 모두 슬라이스 생성 없이 처리
+(_C_NONE, _C_TRUE, _C_FALSE, _C_INT, _C_BIGINT, _C_FLOAT,
+ _C_STR, _C_BYTES, _C_LIST, _C_DICT, _C_ARRAY, _C_ARRAY_REF) = b'NTFiIdsblmaA'
+
+_U32 = struct.Struct('!I')
+_I64 = struct.Struct('!q')
+_F64 = struct.Struct('!d')
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def pack_value(value, out, arrays=None):
+    """
+    값 하나를 태그 + 바이너리로 out 리스트에 추가
+    :param arrays: 리스트를 넘기면 ndarray는 arrays에 모으고 인덱스만 기록 (out-of-band)
+    """
+    if value is None:
+        out.append(_T_NONE)
+    elif value is True or value is False or isinstance(value, np.bool_):
+        out.append(_T_TRUE if value else _T_FALSE)
+    elif isinstance(value, (int, np.integer)):
+        value = int(value)
+        if _INT64_MIN <= value <= _INT64_MAX:
+            out.append(_T_INT + _I64.pack(value))
+        else:
+            digits = str(value).encode('ascii')
+            out.append(_T_BIGINT + _U32.pack(len(digits)) + digits)
+    elif isinstance(value, (float, np.floating)):
+        out.append(_T_FLOAT + _F64.pack(value))
+    elif isinstance(value, str):
+        encoded = value.encode('utf-8')
+        out.append(_T_STR + _U32.pack(len(encoded)))
+        out.append(encoded)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        out.append(_T_BYTES + _U32.pack(len(value)))
+        out.append(value)
+    elif isinstance(value, dict):
+        out.append(_T_DICT + _U32.pack(len(value)))
+        for key, item in value.items():
+            pack_value(key if isinstance(key, str) else str(key), out)
+            pack_value(item, out, arrays)
+    elif isinstance(value, (list, tuple)):
+        out.append(_T_LIST + _U32.pack(len(value)))
+        for item in value:
+            pack_value(item, out, arrays)
+    elif isinstance(value, np.ndarray) and not value.dtype.hasobject and arrays is not None:
+        out.append(_T_ARRAY_REF + _U32.pack(len(arrays)))
+        arrays.append(value)
+    elif isinstance(value, np.ndarray) and (value.dtype.fields is not None or value.dtype.kind in 'Mm'):
+        pack_value(_plain_array(value), out, arrays)
+    elif isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        arr = value if value.flags.c_contiguous else np.ascontiguousarray(value)
+        dtype_str = arr.dtype.str.encode('ascii')
+        out.append(struct.pack(
+            f'!cB{len(dtype_str)}sB{arr.ndim}QI',
+            _T_ARRAY, len(dtype_str), dtype_str, arr.ndim, *arr.shape, arr.nbytes
+        ))
+        out.append(memoryview(arr).cast('B') if arr.ndim and arr.size else arr.tobytes())
+    else:
+        raise TypeError(f"Unsupported value type for binary packing: {type(value).__name__}")
+
+
+def _plain_array(arr):
+    """
+    [JSON 폴백] 바이너리 배열로 보낼 수 없는 dtype -> 기본 타입
+    - 구조화: 필드명 -> 열 배열 dict (일반 dtype 열은 다시 바이너리 배열)
+    - datetime64: ISO 문자열 리스트, timedelta64: 문자열 리스트
+    """
+    if arr.dtype.fields is not None:
+        return {name: np.ascontiguousarray(arr[name]) for name in arr.dtype.names}
+    if arr.dtype.kind == 'M':
+        return np.datetime_as_string(arr).tolist()
+    return arr.astype(str).tolist()
+
+
+def unpack_value(buf, offset, arrays=None):
+    """
+    buf[offset]의 값 하나를 복원 -> (값, 다음 offset)
+    - ndarray는 buf 위의 읽기 전용 뷰 (복사 없음), out-of-band 배열은 arrays[인덱스]
+    """
+    tag = buf[offset]
+    offset += 1
+    if tag == _C_INT:
+        return _I64.unpack_from(buf, offset)[0], offset + 8
+    if tag == _C_FLOAT:
+        return _F64.unpack_from(buf, offset)[0], offset + 8
+    if tag == _C_STR:
+        length = _U32.unpack_from(buf, offset)[0]
+        offset += 4
+        return bytes(buf[offset:offset + length]).decode('utf-8'), offset + length
+    if tag == _C_DICT:
+        count = _U32.unpack_from(buf, offset)[0]
+        offset += 4
+        result = {}
+        for _ in range(count):
+            key, offset = unpack_value(buf, offset)
+            result[key], offset = unpack_value(buf, offset, arrays)
+        return result, offset
+    if tag == _C_LIST:
+        count = _U32.unpack_from(buf, offset)[0]
+        offset += 4
+        result = []
+        for _ in range(count):
+            item, offset = unpack_value(buf, offset, arrays)
+            result.append(item)
+        return result, offset
+    if tag == _C_NONE:
+        return None, offset
+    if tag == _C_TRUE:
+        return True, offset
+    if tag == _C_FALSE:
+        return False, offset
+    if tag == _C_ARRAY_REF:
+        return arrays[_U32.unpack_from(buf, offset)[0]], offset + 4
+    if tag == _C_ARRAY:
+        dtype_len = buf[offset]
+        offset += 1
+        dtype = np.dtype(bytes(buf[offset:offset + dtype_len]).decode('ascii'))
+        offset += dtype_len
+        ndim = buf[offset]
+        offset += 1
+        *shape, nbytes = struct.unpack_from(f'!{ndim}QI', buf, offset)
+        offset += 8 * ndim + 4
+        arr = np.frombuffer(buf, dtype=dtype, count=nbytes // dtype.itemsize, offset=offset).reshape(shape)
+        return arr, offset + nbytes
+    if tag == _C_BYTES:
+        length = _U32.unpack_from(buf, offset)[0]
+        offset += 4
+        return bytes(buf[offset:offset + length]), offset + length
+    if tag == _C_BIGINT:
+        length = _U32.unpack_from(buf, offset)[0]
+        offset += 4
+        return int(bytes(buf[offset:offset + length])), offset + length
+    raise ValueError(f"Unknown packing tag {chr(tag)!r} at offset {offset - 1}")
+
+
+def pack_meta(meta):
+    """메타데이터 dict -> 바이너리 bytes"""
+    out = []
+    pack_value(meta, out)
+    return b''.join(out)
+
+
+def unpack_meta(buf, offset=0):
+    """바이너리 메타데이터 -> dict"""
+    return unpack_value(buf, offset)[0]
@@ -13,11 +13,16 @@ class Config:
     # Data Redis 설정 (Data Plane)
     DATA_REDIS_HOST: str = os.getenv("DATA_REDIS_HOST", "localhost")
     DATA_REDIS_PORT: int = int(os.getenv("DATA_REDIS_PORT", DATA_REDIS_PORT))
+    # 샤딩된 Data Plane: "host:port,host:port,..." (비어 있으면 DATA_REDIS_HOST 단일 인스턴스)
+    DATA_REDIS_HOSTS: str = os.getenv("DATA_REDIS_HOSTS", "")
 
     # Gateway 설정
     GATEWAY_HOST: str = os.getenv("GATEWAY_HOST", "localhost")
     GATEWAY_TCP_PORT: int = int(os.getenv("GATEWAY_TCP_PORT", GATEWAY_TCP_PORT))
     GATEWAY_HTTP_PORT: int = int(os.getenv("GATEWAY_HTTP_PORT", GATEWAY_HTTP_PORT))
 
+    # Frame 메타데이터 직렬화 포맷 ("binary" | "json")
+    META_FORMAT: str = os.getenv("EDGEFLOW_META_FORMAT", "binary")
+
 # 전역 설정 객체
 settings = Config()
\ No newline at end of file
@@ -5,6 +5,7 @@ REDIS_HOST = "edgeflow-redis-service"
 REDIS_PORT = 6379
 DATA_REDIS_HOST = "edgeflow-redis-data-service" # [신규] 고정 호스트명
 DATA_REDIS_PORT = 6380
+DATA_REDIS_SHARD_PORT = 6379  # 샤드 Pod 직접 접속 포트 (Headless Service -> 포트 매핑 없음)
 
 GATEWAY_TCP_PORT = 8080
 GATEWAY_HTTP_PORT = 8000
\ No newline at end of file
@@ -12,18 +12,32 @@ from .registry import NodeSpec, NodeRegistry
 from .qos import QoS
 
 
+def _codec_spec(codec) -> Optional[str]:
+    """Codec instance or spec string -> serializable spec string (None = default)"""
+    return getattr(codec, 'spec', codec)
+
+
 class Linker:
     def __init__(self, system: 'System', source: NodeSpec):
         self.system = system
         self.source = source
 
-    def to(self, target: NodeSpec, channel: str = None, qos: QoS = QoS.REALTIME) -> 'Linker':
-        """Register a connection between nodes with QoS policy"""
+    def to(self, target: NodeSpec, channel: str = None, qos: QoS = QoS.REALTIME,
+           codec=None, max_age: float = None, approximate: bool = True) -> 'Linker':
+        """
+        Register a connection between nodes with QoS policy
+        - codec: payload codec for this link (e.g. "jpeg:50", "png", "raw", "raw+zlib")
+        - max_age: drop frames older than this many seconds (header-only check, before decoding)
+        - approximate: stream length limit is approximate (cheaper, Redis MAXLEN ~) or exact
+        """
         self.system._links.append({
             'source': self.source,
             'target': target,
             'channel': channel,
             'qos': qos,  # [신규] 연결별 QoS 정책
+            'codec': _codec_spec(codec),  # [신규] 연결별 코덱
+            'max_age': max_age,  # [신규] 연결별 최대 허용 지연 (초)
+            'approximate': approximate,  # [신규] 스트림 길이 제한 방식 (근사/정확)
             'broker': self.system.broker
         })
         return Linker(self.system, target)
@@ -100,25 +114,28 @@ class System:
                 source_id = channel if channel else source.name
                 gw_host = settings.GATEWAY_HOST
                 gw_port = settings.GATEWAY_TCP_PORT
-                handler = TcpHandler(gw_host, gw_port, source_id)
+                handler = TcpHandler(gw_host, gw_port, source_id, codec=link.get('codec'))
                 source.output_handlers.append(handler)
                 print(f"🔗 [Direct] {source.name} ==(TCP)==> {target.name} (Channel: {source_id})")
 
             # Redis connection
             else:
                 topic = source.name  # [수정] 토픽 = source 이름만
-                target.input_topics.append({'topic': source.name, 'qos': link.get('qos', QoS.REALTIME)})
+                target.input_topics.append({'topic': source.name, 'qos': link.get('qos', QoS.REALTIME),
+                                            'max_age': link.get('max_age')})
                 limit = getattr(source, 'queue_size', 1)
-                handler = RedisHandler(self.broker, topic, queue_size=limit)
+                handler = RedisHandler(self.broker, topic, queue_size=limit, codec=link.get('codec'),
+                                       approximate=link.get('approximate', True))
                 source.output_handlers.append(handler)
                 print(f"🔗 [Stream] {source.name} --(QoS:{link.get('qos', QoS.REALTIME).name})--> {target.name}")
 
-    def run(self):
+    def run(self, mode: str = "process"):
         """
         Start the System execution (blocking)
         - Proxy to the top-level run() function
+        - mode: "process" (node per process) or "threads" (all nodes in this process)
         """
-        run(self)
+        run(self, mode=mode)
 
     def _resolve_wiring_config(self, node_name: str) -> Dict[str, Any]:
         """Resolve wiring for a specific node into serializable config"""
@@ -147,13 +164,15 @@ class System:
                     'protocol': protocol,
                     'channel': channel,
                     'queue_size': getattr(self._load_node_class(link['source'].path), 'queue_size', 1),
-                    'qos': link.get('qos', QoS.REALTIME)  # [신규] QoS 전달
+                    'qos': link.get('qos', QoS.REALTIME),  # [신규] QoS 전달
+                    'codec': link.get('codec'),
+                    'approximate': link.get('approximate', True)
                 })
             
             if link['target'].name == node_name:
                 source_name = link['source'].name
                 qos = link.get('qos', QoS.REALTIME)
-                inputs.append({'topic': source_name, 'qos': qos})  # [변경] 토픽=source, QoS 포함
+                inputs.append({'topic': source_name, 'qos': qos, 'max_age': link.get('max_age')})  # [변경] 토픽=source, QoS 포함
                 
         return {'outputs': outputs, 'inputs': inputs}
 
@@ -169,18 +188,19 @@ class System:
         for inp in wiring['inputs']:
             topic = inp['topic'] if isinstance(inp, dict) else inp
             qos = inp.get('qos', QoS.REALTIME) if isinstance(inp, dict) else QoS.REALTIME
+            max_age = inp.get('max_age') if isinstance(inp, dict) else None
             if topic not in [t['topic'] if isinstance(t, dict) else t for t in node.input_topics]:
-                node.input_topics.append({'topic': topic, 'qos': qos})
+                node.input_topics.append({'topic': topic, 'qos': qos, 'max_age': max_age})
                 
         # Outputs
-        redis_topics = set()
+        redis_topics = {}  # topic -> RedisHandler
         for out in wiring['outputs']:
             if out['protocol'] == 'tcp':
                 # Gateway connection
                 source_id = out['channel'] if out['channel'] else node.name
                 gw_host = settings.GATEWAY_HOST
                 gw_port = settings.GATEWAY_TCP_PORT
-                handler = TcpHandler(gw_host, gw_port, source_id)
+                handler = TcpHandler(gw_host, gw_port, source_id, codec=out.get('codec'))
                 node.output_handlers.append(handler)
                 print(f"🔗 [Direct] {node.name} ==(TCP)==> {out['target']}")
             else:
@@ -188,16 +208,39 @@ class System:
                 topic = node.name
                 
                 # Deduplicate: Only add one RedisHandler per topic
+                # (one stream per topic -> all Redis links of a source share one codec)
                 if topic not in redis_topics:
-                    handler = RedisHandler(broker, topic, queue_size=out['queue_size'])
+                    handler = RedisHandler(broker, topic, queue_size=out['queue_size'], codec=out.get('codec'),
+                                           approximate=out.get('approximate', True))
                     node.output_handlers.append(handler)
-                    redis_topics.add(topic)
+                    redis_topics[topic] = handler
+                else:
+                    handler = redis_topics[topic]
+                    if out.get('codec') != handler.codec:
+                        print(f"⚠️ [Codec] {node.name} -> {out['target']}: stream '{topic}' already uses "
+                              f"codec '{handler.codec or 'default'}', ignoring '{out.get('codec')}'")
+                    # 정확한 길이 제한을 요청한 링크가 하나라도 있으면 스트림 전체에 적용
+                    if not out.get('approximate', True) and handler.approximate and handler.queue_size > 0:
+                        handler.approximate = False
+                        broker.register_topic(topic, handler.queue_size, approximate=False)
                 
                 print(f"🔗 [Stream] {node.name} --(QoS:{out.get('qos', 'REALTIME').name if hasattr(out.get('qos'), 'name') else 'REALTIME'})--> {out['target']}")
 
     @staticmethod
     def _run_node_process(name: str, path: str, node_config: Dict, broker_config: Dict, wiring_config: Dict):
         """Bootstrap function running in a separate process"""
+        node = System._build_node(name, path, node_config, broker_config, wiring_config)
+        if node is None:
+            return
+
+        # 4. Execute
+        print(f"🚀 [Process:{name}] Starting execution loop...", flush=True)
+        node.execute()
+
+    @staticmethod
+    def _build_node(name: str, path: str, node_config: Dict, broker_config: Dict, wiring_config: Dict,
+                    runtime: str = "Process"):
+        """Create broker + node + handlers for one node (process bootstrap / thread mode)"""
         # 1. Re-establish Broker Connection using the serialization protocol
         # Dynamic import based on broker_config
         module_path, class_name = broker_config['__class_path__'].rsplit('.', 1)
@@ -206,7 +249,7 @@ class System:
         
         # Use the from_config protocol method
         broker = BrokerClass.from_config(broker_config)
-        print(f"⚡ [Process:{name}] Broker connected: {broker_config.get('host')} ({class_name})", flush=True)
+        print(f"⚡ [{runtime}:{name}] Broker connected: {broker_config.get('host', broker_config.get('name'))} ({class_name})", flush=True)
 
         # 2. Load Class & Instantiate
         # We need to replicate _load_node_class logic or import it.
@@ -230,31 +273,33 @@ class System:
                     break
         
         if not node_cls:
-            print(f"❌ [Process:{name}] No EdgeNode found in {path}", flush=True)
-            return
+            print(f"❌ [{runtime}:{name}] No EdgeNode found in {path}", flush=True)
+            return None
 
         node = node_cls(broker=broker, **node_config)
         node.name = name
         
         # 3. Wiring (Handlers)
         System._hydrate_node_handlers(node, broker, wiring_config)
-        
-        # 4. Execute
-        print(f"🚀 [Process:{name}] Starting execution loop...", flush=True)
-        node.execute()
+        return node
 
 # Backward compatibility alias
 EdgeApp = System
 
 
-def run(*systems: System):
+def run(*systems: System, mode: str = "process"):
     """
     Run one or multiple Systems (Entry Point)
     
     - Single System: run(sys)
     - Multi System:  run(sys1, sys2)
+    - mode="threads": 모든 노드를 현재 프로세스의 스레드로 실행
+      (MemoryBroker와 함께 쓰면 직렬화/Redis 없이 Frame 참조 전달, cv2/numpy 등 GIL 해제 작업은 병렬 실행)
     """
     import multiprocessing
+
+    if mode not in ("process", "threads"):
+        raise ValueError(f"Unknown run mode: {mode} (expected 'process' or 'threads')")
     
     # 1. Collect all unique nodes
     all_specs: Dict[str, NodeSpec] = {}
@@ -295,18 +340,21 @@ def run(*systems: System):
                     'protocol': protocol,
                     'channel': channel,
                     'queue_size': queue_size,
+                    'codec': link.get('codec'),
+                    'approximate': link.get('approximate', True),
                     'broker_config': broker.to_config() if broker else None
                 })
             
             if link['target'].name == node_name:
                 source_name = link['source'].name
                 qos = link.get('qos', QoS.REALTIME)
-                inputs.append({'topic': source_name, 'qos': qos})  # [수정] 토픽=source
+                inputs.append({'topic': source_name, 'qos': qos, 'max_age': link.get('max_age')})  # [수정] 토픽=source
         
         return {'outputs': outputs, 'inputs': inputs}
     
-    # 4. Launch processes
+    # 4. Launch processes (or threads)
     processes = []
+    nodes = []  # Thread mode: node instances (for graceful stop)
     
     # [Reset Broker State]
     # Assuming all systems share the same physical broker for now,
@@ -321,27 +369,46 @@ def run(*systems: System):
         if systems and hasattr(systems[0].broker, 'reset'):
              systems[0].broker.reset()
 
+    # in-process 브로커는 프로세스 간에 공유되지 않음
+    if mode == "process" and getattr(systems[0].broker, 'accepts_frames', False):
+        raise ValueError(f"{type(systems[0].broker).__name__} is in-process only: use run(..., mode=\"threads\")")
+
     default_broker_config = systems[0].broker.to_config()
     
     for name, spec in all_specs.items():
         wiring_config = resolve_merged_wiring(name)
         
-        p = multiprocessing.Process(
-            target=System._run_node_process,
-            args=(name, spec.path, spec.config, default_broker_config, wiring_config),
-            daemon=True
-        )
+        if mode == "threads":
+            node = System._build_node(name, spec.path, spec.config, default_broker_config, wiring_config,
+                                      runtime="Thread")
+            if node is None:
+                continue
+            p = threading.Thread(target=node.execute, name=f"edgeflow-{name}", daemon=True)
+            nodes.append(node)
+        else:
+            p = multiprocessing.Process(
+                target=System._run_node_process,
+                args=(name, spec.path, spec.config, default_broker_config, wiring_config),
+                daemon=True
+            )
         p.start()
         processes.append(p)
     
-    print(f"▶️ [EdgeFlow] Launching {len(processes)} nodes from {len(systems)} system(s)")
+    print(f"▶️ [EdgeFlow] Launching {len(processes)} nodes from {len(systems)} system(s) (mode: {mode})")
     
     try:
         while True:
             time.sleep(0.5)
     except KeyboardInterrupt:
-        print("\n👋 System Shutdown - Stopping all processes...")
-        for p in processes:
-            p.terminate()
+        print(f"\n👋 System Shutdown - Stopping all {'threads' if mode == 'threads' else 'processes'}...")
+        if mode == "threads":
+            # 스레드는 강제 종료가 없으므로 루프 플래그를 내리고 잠시 대기 (daemon 스레드는 종료 시 정리)
+            for node in nodes:
+                node.running = False
+            for t in processes:
+                t.join(timeout=2)
+        else:
+            for p in processes:
+                p.terminate()
         import sys as sys_module
         sys_module.exit(0)
\ No newline at end of file
@@ -3,24 +3,54 @@ import socket
 import struct
 import asyncio
 
+
+def _send_buffers(sock, buffers):
+    """
+    [Scatter-Gather] 버퍼 리스트를 이어 붙이지 않고 sendmsg로 커널에 직접 전달
+    - 부분 전송 시 남은 버퍼부터 이어서 전송 (sendall과 동일한 보장)
+    - sendmsg가 없는 플랫폼(Windows)은 이어 붙여서 sendall
+    """
+    if not hasattr(sock, 'sendmsg'):
+        sock.sendall(b''.join(buffers))
+        return
+
+    views = [memoryview(buf) for buf in buffers if len(buf)]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if sent:
+            views[0] = views[0][sent:]
+
+
 class RedisHandler:
-    def __init__(self, broker, topic, queue_size=1):
+    def __init__(self, broker, topic, queue_size=1, codec=None, approximate=True):
         self.broker = broker
         self.topic = topic
         self.queue_size = queue_size
+        self.codec = codec  # 링크별 코덱 (None: Frame/기본 코덱)
+        self.approximate = approximate  # 스트림 길이 제한: 근사(MAXLEN ~) / 정확
+
+        # [Wiring] 스트림 길이 제한은 한 번만 등록 -> 이후 push(XADD)가 직접 적용 (프레임당 trim 없음)
+        if self.queue_size > 0:
+            self.broker.register_topic(self.topic, self.queue_size, approximate=approximate)
 
     def send(self, frame):
         # Redis 브로커를 통해 전송 (기존 Broker.push 재사용)
-        self.broker.push(self.topic, frame.to_bytes())
-
-        if self.queue_size > 0:
-            self.broker.trim(self.topic, self.queue_size)
+        # 토픽은 헤더에만 기록 -> 수신측이 frame.topic으로 확인 (메타/페이로드는 핸들러 간 공유)
+        if self.broker.accepts_frames:
+            # [In-Process] 직렬화 없이 Frame 참조 전달 (MemoryBroker, Thread Mode)
+            self.broker.push(self.topic, frame.routed(self.topic))
+        else:
+            self.broker.push_buffers(self.topic, frame.to_buffers(codec=self.codec, topic=self.topic))
 
 class TcpHandler:
-    def __init__(self, host, port, source_id):
+    def __init__(self, host, port, source_id, codec=None):
         self.host = host
         self.port = port
         self.source_id = source_id
+        self.codec = codec  # 링크별 코덱 (None: Frame/기본 코덱)
         self.sock = None
 
     def connect(self):
@@ -43,18 +73,16 @@ class TcpHandler:
             if self.sock is None: return
 
         try:
-            # 1. [Identity] Gateway 라우팅을 위해 소스 ID 주입
-            # 원본 프레임의 메타데이터를 수정하는 것이므로 주의 (복사본 사용 권장되나 성능상 직접 수정)
-            frame.meta["topic"] = self.source_id
-
-            # 2. [Serialization] Frame -> Bytes
-            packet_body = frame.to_bytes()
+            # 1. [Identity + Serialization] Gateway 라우팅용 소스 ID는 패킷 헤더에만 기록
+            # (frame.meta는 수정하지 않음 -> 다른 핸들러와 메타/페이로드 인코딩 결과 공유)
+            buffers = frame.to_buffers(codec=self.codec, topic=self.source_id)
             
-            # 3. [Framing] 길이 헤더 추가 (4 bytes)
-            length_header = struct.pack('>I', len(packet_body))
+            # 2. [Framing] 길이 헤더 추가 (4 bytes)
+            length_header = struct.pack('>I', sum(len(buf) for buf in buffers))
             
-            # print(f"DEBUG: TcpHandler sending topic={frame.meta.get('topic')} len={len(packet_body)}")
-            self.sock.sendall(length_header + packet_body)
+            # print(f"DEBUG: TcpHandler sending topic={self.source_id} len={sum(len(buf) for buf in buffers)}")
+            # 3. [Zero-Copy] 길이 헤더 + 패킷 버퍼들을 sendmsg로 한 번에 전송 (이어 붙이기 없음)
+            _send_buffers(self.sock, [length_header, *buffers])
 
         except (BrokenPipeError, ConnectionResetError):
             self.sock.close()
@@ -48,11 +48,12 @@ class EdgeNode(ABC):
                 print(f"⚠️ Failed to apply wiring env: {e}")
 
     def send_result(self, frame):
-        """연결된 모든 핸들러에게 데이터 전송"""
+        """연결된 모든 핸들러에게 데이터 전송 (페이로드는 코덱별로 한 번만 인코딩)"""
         if not frame:
             return
-        for handler in self.output_handlers:
-            handler.send(frame)
+        with frame.encode_once():
+            for handler in self.output_handlers:
+                handler.send(frame)
 
     def _apply_wiring(self, wiring):
         """Apply wiring config from JSON (K8s Env Injection)"""
@@ -66,8 +67,9 @@ class EdgeNode(ABC):
             qos_val = inp.get('qos', QoS.REALTIME) if isinstance(inp, dict) else QoS.REALTIME
             # QoS Enum restoration (if integer/string from JSON)
             if isinstance(qos_val, int): qos_val = QoS(qos_val)
+            max_age = inp.get('max_age') if isinstance(inp, dict) else None
             
-            self.input_topics.append({'topic': topic, 'qos': qos_val})
+            self.input_topics.append({'topic': topic, 'qos': qos_val, 'max_age': max_age})
                 
         # Outputs
         redis_topics = set()
@@ -76,13 +78,14 @@ class EdgeNode(ABC):
                 source_id = out['channel'] if out['channel'] else self.name
                 gw_host = settings.GATEWAY_HOST
                 gw_port = settings.GATEWAY_TCP_PORT
-                handler = TcpHandler(gw_host, gw_port, source_id)
+                handler = TcpHandler(gw_host, gw_port, source_id, codec=out.get('codec'))
                 self.output_handlers.append(handler)
                 print(f"🔗 [Direct] {self.name} ==(TCP)==> {out['target']}")
             else:
                 topic = self.name
                 if topic not in redis_topics:
-                    handler = RedisHandler(self.broker, topic, queue_size=out['queue_size'])
+                    handler = RedisHandler(self.broker, topic, queue_size=out['queue_size'], codec=out.get('codec'),
+                                           approximate=out.get('approximate', True))
                     self.output_handlers.append(handler)
                     redis_topics.add(topic)
                 # print log...
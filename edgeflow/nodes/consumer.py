@@ -15,16 +15,41 @@ from ..qos import QoS
 class ConsumerNode(EdgeNode):
     """업스트림에서 데이터를 받아 처리하는 노드"""
     node_type = "consumer"
+    pass_frame = False  # True: loop()에 Frame 객체 전달 (data 접근 전까지 디코딩 안 함)
+    max_age = None      # 기본 최대 허용 지연 (초, 링크의 max_age가 우선)
     
     def __init__(self, broker=None, replicas=1, **kwargs):
         super().__init__(broker=broker, **kwargs)
         self.replicas = replicas
+        self.dropped_frames = 0  # max_age/deadline 초과로 디코딩 전에 버린 프레임 수
+
+    def _is_stale(self, packet, max_age):
+        """[Internal] 고정 헤더만 읽어 만료 여부 판단 (메타/페이로드 디코딩 전)"""
+        header = packet if isinstance(packet, Frame) else Frame.peek_header(packet)
+        if header is not None and header.expired(max_age):
+            self.dropped_frames += 1
+            return True
+        return False
+
+    def _loop_input(self, packet, frame):
+        """
+        [Internal] loop() 인자: pass_frame이면 Frame, 아니면 data
+        - in-process 브로커(thread mode)는 Frame을 참조로 전달 -> 배열은 모든 구독자가 공유하는 읽기 전용 뷰
+          loop(data)는 자기만의 이미지를 받으므로 (cv2.rectangle 등 제자리 그리기) 사본 전달
+        """
+        if self.pass_frame:
+            return frame
+        data = frame.data
+        if packet is frame and getattr(data, 'flags', None) is not None and not data.flags.writeable:
+            data = data.copy()
+        return data
 
     def loop(self, data):
         """
         [User Hook] 데이터를 처리하여 반환
-        - data: 업스트림에서 받은 이미지/데이터
+        - data: 업스트림에서 받은 이미지/데이터 (pass_frame=True면 Frame 객체)
         - return: 처리된 결과 (자동으로 다운스트림 전송)
+        - return Frame: 그대로 전송 (수정 안 된 수신 프레임은 재인코딩 없이 원본 bytes 전달)
         - return None: 해당 프레임 스킵
         """
         raise NotImplementedError("ConsumerNode requires loop(data) implementation")
@@ -40,9 +65,11 @@ class ConsumerNode(EdgeNode):
         if isinstance(first_input, dict):
             target_topic = first_input['topic']
             qos = first_input.get('qos', QoS.REALTIME)
+            max_age = first_input.get('max_age') or self.max_age
         else:
             target_topic = first_input
             qos = QoS.REALTIME
+            max_age = self.max_age
         
         group_name = getattr(self, 'name', 'default')
         consumer_id = self.hostname
@@ -61,17 +88,27 @@ class ConsumerNode(EdgeNode):
             if not packet:
                 continue
 
+            # [Stale Drop] 밀린 프레임은 헤더 파싱 속도로 건너뜀 (디코딩 비용 없음)
+            if self._is_stale(packet, max_age):
+                continue
+
             frame = Frame.from_bytes(packet)
             if not frame:
                 continue
 
             try:
-                result = self.loop(frame.data)
+                # [Lazy] pass_frame 노드는 Frame을 그대로 받음 -> frame.data 접근 시에만 디코딩
+                result = self.loop(self._loop_input(packet, frame))
                 if result is None:
                     continue
 
-                out_img, out_meta = result if isinstance(result, tuple) else (result, {})
-                resp = Frame(frame.frame_id, frame.timestamp, out_meta, out_img)
+                if isinstance(result, Frame):
+                    resp = result
+                else:
+                    out_img, out_meta = result if isinstance(result, tuple) else (result, {})
+                    # 입력 프레임의 Trace를 이어받아 End-to-End 지연 측정 유지
+                    resp = Frame(frame.frame_id, frame.timestamp, out_meta, out_img, trace=frame.trace)
+                    resp.mark('processed')
                 self.send_result(resp)
 
             except Exception as e:
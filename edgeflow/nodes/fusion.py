@@ -95,8 +95,10 @@ class FusionNode(EdgeNode):
                         frame_id=base_frame.frame_id, 
                         timestamp=base_frame.timestamp, 
                         meta={}, 
-                        data=result
+                        data=result,
+                        trace=base_frame.trace
                     )
+                    out_frame.mark('processed')
                 
                 self.send_result(out_frame)
         else:
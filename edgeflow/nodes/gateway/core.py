@@ -74,7 +74,7 @@ class GatewayNode(EdgeNode):
 
                 total_len = int.from_bytes(len_bytes, 'big')
                 
-                # 본문 읽기
+                # 본문 읽기 (이후 Frame 파싱 ~ WebInterface 송출까지 이 버퍼를 memoryview로 공유, 추가 복사 없음)
                 try:
                     payload = await reader.readexactly(total_len)
                 except asyncio.IncompleteReadError:
@@ -83,6 +83,7 @@ class GatewayNode(EdgeNode):
                 frame = Frame.from_bytes(payload, avoid_decode=True)
                 if not frame:
                     continue
+                frame.mark('gateway_in')
 
                 # 모든 인터페이스에게 브로드캐스트
                 tasks = [iface.on_frame(frame) for iface in self.interfaces]
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import time
 import uvicorn
 import traceback
@@ -7,6 +8,7 @@ from fastapi.responses import StreamingResponse, JSONResponse, HTMLResponse
 from .base import BaseInterface
 from collections import defaultdict
 from ....comms import Frame
+from ....comms.frame import NumpyEncoder
 from ....utils.buffer import TimeJitterBuffer
 
 class WebInterface(BaseInterface):
@@ -80,17 +82,18 @@ class WebInterface(BaseInterface):
                 topic: {"current": len(buf.heap), "max": buf.max_size}
                 for topic, buf in self.buffers.items()
             }
+            topics = list(self.buffers.keys())
             
-            # 2. Redis Queue Size
-            queue_stats = {}
-            if self.broker:
-                for topic in self.buffers.keys():
-                    queue_stats[topic] = self.broker.queue_size(topic)
-            
-            return JSONResponse(content={
-                "buffers": buffer_stats,
-                "queues": queue_stats
-            })
+        # 2. Redis Queue Size (비동기 조회 -> 조회 중에도 스트림/락을 막지 않음)
+        queue_stats = {}
+        if self.broker:
+            sizes = await asyncio.gather(*(self.broker.aqueue_size(topic) for topic in topics))
+            queue_stats = dict(zip(topics, sizes))
+        
+        return JSONResponse(content={
+            "buffers": buffer_stats,
+            "queues": queue_stats
+        })
 
     async def root(self):
         from fastapi.responses import RedirectResponse
@@ -111,7 +114,7 @@ class WebInterface(BaseInterface):
     async def on_frame(self, frame):
         # Gateway가 이 함수를 호출해서 데이터를 넣어줌
         async with self.lock:
-            topic = frame.meta.get("topic", "default")
+            topic = frame.topic or "default"  # 헤더의 라우팅 토픽 (TcpHandler source_id)
             # print(f"DEBUG: Frame received on topic '{topic}'", flush=True) # Too noisy
             
             if topic not in self.buffers:
@@ -123,7 +126,8 @@ class WebInterface(BaseInterface):
             if frame.meta:
                 if topic not in self.latest_meta:
                     self.latest_meta[topic] = {}
-                self.latest_meta[topic].update(frame.meta)
+                # 바이너리 메타의 ndarray(수신 패킷 위 뷰) -> JSON 호환 값으로 복사 (API / WebSocket 응답용, 패킷 참조 해제)
+                self.latest_meta[topic].update(json.loads(json.dumps(frame.meta, cls=NumpyEncoder)))
 
     def route(self, path, methods=["GET"]):
         def decorator(func):
@@ -145,8 +149,10 @@ class WebInterface(BaseInterface):
                         data = self.buffers[topic].pop()
 
                 if data:
-                    yield (b'--frameboundary\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + data + b'\r\n')
+                    # [Zero-Copy] JPEG(수신 패킷의 memoryview)를 이어 붙이지 않고 파트별로 전송
+                    yield b'--frameboundary\r\nContent-Type: image/jpeg\r\n\r\n'
+                    yield data
+                    yield b'\r\n'
                     wait_time = 0.001 if self.buffer_delay == 0.0 else 0.01
                     await asyncio.sleep(wait_time)
                 else:
@@ -235,6 +241,11 @@ class WebInterface(BaseInterface):
         try:
             fps_data = await self._calculate_fps()
             
+            # 2. Redis Queue Stats (Dynamic Discovery) - 비동기 조회, 락 밖에서 실행 (MJPEG 스트림 블로킹 방지)
+            queue_stats = {}
+            if self.broker:
+                queue_stats = await self.broker.aget_queue_stats()
+            
             async with self.lock:
                 # 1. Buffer Stats
                 buffer_stats = {
@@ -242,11 +253,6 @@ class WebInterface(BaseInterface):
                     for topic, buf in self.buffers.items()
                 }
                 
-                # 2. Redis Queue Stats (Dynamic Discovery)
-                queue_stats = {}
-                if self.broker:
-                    queue_stats = self.broker.get_queue_stats()  # [변경] 동적 조회 사용
-                
                 # 3. Status Info
                 status_info = self.latest_meta
                 
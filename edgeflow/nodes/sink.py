@@ -22,7 +22,7 @@ class SinkNode(ConsumerNode):
     def loop(self, data):
         """
         [User Hook] Process incoming data (no return value)
-        - data: Upstream image/data
+        - data: Upstream image/data (Frame object if pass_frame=True)
         - No return value (terminal node)
         """
         raise NotImplementedError("SinkNode requires loop(data) implementation")
@@ -36,8 +36,10 @@ class SinkNode(ConsumerNode):
         first_input = self.input_topics[0]
         if isinstance(first_input, dict):
             target_topic = first_input['topic']
+            max_age = first_input.get('max_age') or self.max_age
         else:
             target_topic = first_input
+            max_age = self.max_age
         
         # SinkNode always uses DURABLE (consumer group, sequential reading)
         group_name = getattr(self, 'name', 'sink')
@@ -51,11 +53,16 @@ class SinkNode(ConsumerNode):
             if not packet:
                 continue
 
+            # Stale drop: expired frames are skipped after a header-only parse
+            if self._is_stale(packet, max_age):
+                continue
+
             frame = Frame.from_bytes(packet)
             if not frame:
                 continue
 
             try:
-                self.loop(frame.data)
+                # Lazy: with pass_frame, payload is decoded only if loop() touches frame.data
+                self.loop(self._loop_input(packet, frame))
             except Exception as e:
                 print(f"⚠️ Sink Error: {e}")
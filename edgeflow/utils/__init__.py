@@ -1,3 +1,4 @@
 from .buffer import TimeJitterBuffer
+from .hashring import HashRing
 
-__all__ = ["TimeJitterBuffer"]
+__all__ = ["TimeJitterBuffer", "HashRing"]
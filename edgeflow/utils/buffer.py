@@ -1,5 +1,6 @@
 import time
 import heapq
+import itertools
 
 class TimeJitterBuffer:
     """
@@ -11,7 +12,8 @@ class TimeJitterBuffer:
     def __init__(self, buffer_delay=0.0, max_size=60):
         self.buffer_delay = buffer_delay
         self.max_size = max_size  # 30fps 기준 약 2초 분량
-        self.heap = [] # (timestamp, data_bytes)
+        self.heap = [] # (timestamp, seq, data_bytes)
+        self._seq = itertools.count()  # 같은 timestamp일 때 data(memoryview) 비교 방지
 
     def push(self, frame):
         # 버퍼 크기 제한 - 초과 시 가장 오래된 프레임 삭제
@@ -20,7 +22,7 @@ class TimeJitterBuffer:
         
         ts = frame.timestamp
         data = frame.get_data_bytes()
-        heapq.heappush(self.heap, (ts, data))
+        heapq.heappush(self.heap, (ts, next(self._seq), data))
 
     def pop(self):
         if not self.heap:
@@ -28,7 +30,7 @@ class TimeJitterBuffer:
 
         # 1. 즉시 전송 모드
         if self.buffer_delay == 0.0:
-            return heapq.heappop(self.heap)[1]
+            return heapq.heappop(self.heap)[2]
 
         # 2. 버퍼링 모드
         now = time.time()
@@ -42,7 +44,7 @@ class TimeJitterBuffer:
             return None
 
         # 재생 시간 체크
-        oldest_ts, data = self.heap[0]
+        oldest_ts, _, data = self.heap[0]
         if oldest_ts <= play_deadline:
             heapq.heappop(self.heap)
             return data
@@ -0,0 +1,48 @@
+import bisect
+import hashlib
+
+class HashRing:
+    """
+    [공용 유틸리티] Consistent Hash Ring
+    - get(key): 키를 담당할 노드 (링에서 키 해시 다음 위치의 노드)
+    - 노드 추가/제거 시 약 1/N 키만 다른 노드로 이동 (전체 재배치 없음)
+    - vnodes: 노드당 가상 노드 수 (많을수록 노드 간 분포가 균일)
+    """
+    def __init__(self, nodes=(), vnodes=160):
+        self.vnodes = vnodes
+        self._ring = []   # 정렬된 가상 노드 해시 위치
+        self._owner = {}  # 해시 위치 -> 노드
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key):
+        # 프로세스와 무관하게 같은 값 (내장 hash()는 PYTHONHASHSEED에 따라 달라짐)
+        return int.from_bytes(hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def add(self, node):
+        for i in range(self.vnodes):
+            point = self._hash(f"{node}#{i}")
+            if point not in self._owner:
+                bisect.insort(self._ring, point)
+            self._owner[point] = node
+
+    def remove(self, node):
+        for i in range(self.vnodes):
+            point = self._hash(f"{node}#{i}")
+            if self._owner.get(point) == node:
+                del self._owner[point]
+                self._ring.pop(bisect.bisect_left(self._ring, point))
+
+    def get(self, key):
+        if not self._ring:
+            return None
+        idx = bisect.bisect(self._ring, self._hash(key)) % len(self._ring)
+        return self._owner[self._ring[idx]]
+
+    @property
+    def nodes(self):
+        return list(dict.fromkeys(self._owner.values()))
+
+    def __len__(self):
+        return len(set(self._owner.values()))
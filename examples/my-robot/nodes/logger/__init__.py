@@ -7,12 +7,13 @@ from edgeflow.nodes import SinkNode
 
 class LoggerNode(SinkNode):
     """Simple logging sink - no output"""
+    pass_frame = True  # Only counts frames -> payload is never decoded
     
     def setup(self):
         print(f"📝 [Logger] Initialized on host: {self.hostname}")
         self.frame_count = 0
     
-    def loop(self, data):
+    def loop(self, frame):
         """Log incoming frame metadata"""
         self.frame_count += 1
         if self.frame_count % 30 == 0:  # Log every 30 frames
@@ -16,6 +16,9 @@ setup(
         "fastapi",
         "uvicorn"
     ],
+    extras_require={
+        "zmq": ["pyzmq>=22.0"],  # HybridBroker (ZeroMQ data plane)
+    },
     entry_points={
         "console_scripts": [
             "edgeflow=edgeflow.__main__:main",  # 터미널에서 edgeflow 실행 시 호출
@@ -0,0 +1,60 @@
+import fakeredis
+import pytest
+import redis
+
+
+def _python_gc(r):
+    """BLOB_GC_LUA without XINFO (fakeredis has no XINFO inside Lua scripts)"""
+    def gc(keys, client=None):
+        first = r.xrange(keys[0], count=1)
+        if not first:
+            return [b'']
+        result = [first[0][0]]
+        for group in r.xinfo_groups(keys[0]):
+            if group['pending'] > 0:
+                result += [r.xpending(keys[0], group['name'])['min'], 0]
+            else:
+                result += [group['last-delivered-id'], 1]
+        return result
+    return gc
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """redis.Redis -> fakeredis (one in-memory server per host:port) -> {(host, port): server}"""
+    servers = {}
+
+    def connect(*args, host=None, port=None, **kwargs):
+        return fakeredis.FakeRedis(server=servers.setdefault((host, port), fakeredis.FakeServer()))
+
+    monkeypatch.setattr(redis, "Redis", connect)
+    return servers
+
+
+@pytest.fixture
+def dual_broker(fake_redis, monkeypatch):
+    """
+    DualRedisBroker factory on fakeredis
+    - separate=False: ctrl and data share one server (same-instance path)
+    - separate=True: data plane on its own server (write-behind path)
+    """
+    import edgeflow.comms.brokers.dual_redis as dual_redis
+
+    monkeypatch.setattr(dual_redis, "_GC_INTERVAL", 0)
+    brokers = []
+
+    def make(separate=False, **kwargs):
+        kwargs.setdefault("inline_threshold", 0)
+        broker = dual_redis.DualRedisBroker(
+            ctrl_host="ctrl", ctrl_port=6379,
+            data_host="data" if separate else "ctrl", data_port=6379, **kwargs)
+        if not separate:
+            broker.data_redis = broker.ctrl_redis
+            broker._data_nodes.clear()
+        broker._gc_script = _python_gc(broker.ctrl_redis)
+        brokers.append(broker)
+        return broker
+
+    yield make
+    for broker in brokers:
+        broker.flush(timeout=1.0)
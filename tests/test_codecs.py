@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from edgeflow.comms.codecs import get_codec
+from edgeflow.comms.frame import Frame
+
+
+RECORD = np.dtype({
+    "names": ["id", "seen", "box"],
+    "formats": ["u1", "<M8[ms]", ("<f4", (4,))],
+    "offsets": [0, 8, 16],
+    "itemsize": 32,
+})
+
+
+def _arrays():
+    records = np.zeros(3, RECORD)
+    records["id"] = [1, 2, 3]
+    records["seen"] = np.datetime64("2024-01-01T00:00:00", "ms") + np.arange(3)
+    records["box"] = np.arange(12, dtype=np.float32).reshape(3, 4)
+    nested = np.zeros(2, [("pos", [("x", "<f8"), ("y", "<f8")]), ("flag", "?")])
+    nested["pos"]["x"] = [1.5, 2.5]
+    return {
+        "structured": records,
+        "nested": nested,
+        "datetime": np.arange(4).astype("M8[ns]"),
+        "timedelta": np.arange(4).astype("m8[s]").reshape(2, 2),
+        "strided": np.arange(16, dtype=np.float32).reshape(4, 4)[:, ::2],
+        "fortran": np.asfortranarray(np.arange(6, dtype=np.int16).reshape(2, 3)),
+        "scalar": np.array(7, np.int64),
+    }
+
+
+def _assert_same(got, expected):
+    assert got.dtype == expected.dtype
+    assert got.shape == expected.shape
+    assert got.tobytes() == np.ascontiguousarray(expected).tobytes()
+
+
+@pytest.mark.parametrize("name", sorted(_arrays()))
+@pytest.mark.parametrize("codec", ["raw", "raw+zlib"])
+def test_raw_round_trip(name, codec):
+    arr = _arrays()[name]
+    frame = Frame.from_bytes(Frame(1, 0.0, {}, arr, codec=codec).to_bytes())
+    _assert_same(frame.data, arr)
+
+
+@pytest.mark.parametrize("name", sorted(_arrays()))
+def test_struct_round_trip(name):
+    arr = _arrays()[name]
+    payload = {"arr": arr, "items": [arr, 1]}
+    frame = Frame.from_bytes(Frame(1, 0.0, {}, payload, codec="struct").to_bytes())
+    _assert_same(frame.data["arr"], arr)
+    _assert_same(frame.data["items"][0], arr)
+
+
+def test_plain_dtype_header_unchanged():
+    # Plain dtypes keep the dtype.str descriptor (packets from older senders still decode)
+    desc = get_codec("raw")._pack_descriptor(np.zeros((2, 3), np.uint8))
+    assert desc[0] == len("|u1") and desc[1:4] == b"|u1"
+
+
+def test_raw_decode_is_read_only_view():
+    frame = Frame.from_bytes(Frame(1, 0.0, {}, np.zeros((4, 4), np.uint8), codec="raw").to_bytes())
+    assert not frame.data.flags.writeable
+
+
+@pytest.mark.parametrize("codec", ["jpeg", "png", "webp"])
+def test_image_codecs_reject_empty_arrays(codec):
+    empty = np.zeros((0, 4, 3), np.uint8)
+    assert not get_codec(codec).accepts(empty)
+    # Frame falls back to raw instead of failing in cv2.imencode
+    frame = Frame.from_bytes(Frame(1, 0.0, {}, empty, codec=codec).to_bytes())
+    _assert_same(frame.data, empty)
+
+
+def test_object_arrays_are_not_raw():
+    assert not get_codec("raw").accepts(np.array([object()], dtype=object))
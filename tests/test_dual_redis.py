@@ -0,0 +1,49 @@
+import time
+
+import numpy as np
+
+from edgeflow.comms.brokers import DualRedisBroker
+from edgeflow.comms.frame import Frame
+
+
+IMAGE = np.zeros((32, 32), np.uint8)
+
+
+def _push(broker, topic, frame_id):
+    broker.push_buffers(topic, Frame(frame_id, 0.0, {}, IMAGE, codec="raw").to_buffers())
+
+
+def _frame_id(packet):
+    return Frame.from_bytes(packet).frame_id
+
+
+def test_claim_idle_reclaims_dead_consumer(dual_broker):
+    dead, live = dual_broker(claim_idle=0.05), dual_broker(claim_idle=0.05)
+    dead.pop("cam", timeout=0.01, group="g", consumer="dead")  # creates the group
+    for i in range(3):
+        _push(dead, "cam", i)
+    assert _frame_id(dead.pop("cam", timeout=0.1, group="g", consumer="dead")) == 0
+
+    # Not idle long enough yet -> the batch stays with its consumer
+    assert live.pop("cam", timeout=0.01, group="g", consumer="live") is None
+    time.sleep(0.1)
+    live._next_claim.clear()
+    claimed = [live.pop("cam", timeout=0.01, group="g", consumer="live") for _ in range(3)]
+    assert [_frame_id(p) for p in claimed] == [0, 1, 2]
+
+
+def test_claim_idle_disabled(dual_broker):
+    dead, live = dual_broker(claim_idle=None), dual_broker(claim_idle=None)
+    dead.pop("cam", timeout=0.01, group="g", consumer="dead")
+    _push(dead, "cam", 1)
+    assert dead.pop("cam", timeout=0.1, group="g", consumer="dead") is not None
+    time.sleep(0.02)
+    assert live.pop("cam", timeout=0.01, group="g", consumer="live") is None
+    assert live.ctrl_redis.xpending("cam", "g")["pending"] == 1
+
+
+def test_config_round_trip_keeps_claim_idle(dual_broker):
+    broker = dual_broker(claim_idle=120.0)
+    config = broker.to_config()
+    assert config["claim_idle"] == 120.0
+    assert DualRedisBroker.from_config(config).claim_idle == 120.0
@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+import pytest
+
+from edgeflow.comms.frame import Frame
+
+pytest.importorskip("zmq")
+from edgeflow.comms.brokers import hybrid  # noqa: E402
+
+
+IMAGE = np.arange(64, dtype=np.uint8).reshape(8, 8)
+
+
+@pytest.fixture
+def pair(fake_redis):
+    producer = hybrid.HybridBroker(redis_host="ctrl", redis_port=6379, advertise_host="127.0.0.1")
+    consumer = hybrid.HybridBroker(redis_host="ctrl", redis_port=6379)
+    yield producer, consumer
+    consumer.close()
+    producer.close()
+
+
+def _push(broker, frame_id):
+    broker.push_buffers("cam", Frame(frame_id, 0.0, {}, IMAGE, codec="raw").to_buffers())
+
+
+def test_pop_latest_and_pop(pair):
+    producer, consumer = pair
+    consumer.pop("cam", timeout=0, group="g")  # creates the group
+    _push(producer, 0)
+
+    # PUB/SUB: frames sent before the subscription connects are dropped -> push until one arrives
+    packet = None
+    for frame_id in range(1, 50):
+        packet = consumer.pop_latest("cam", timeout=0.05)
+        if packet is not None:
+            break
+        _push(producer, frame_id)
+    assert packet is not None
+    np.testing.assert_array_equal(Frame.from_bytes(packet).data, IMAGE)
+
+    # DURABLE: signals of frames lost before the subscription come back as None (data missing)
+    _push(producer, 100)
+    time.sleep(0.05)
+    frames = [consumer.pop("cam", timeout=0, group="g") for _ in range(frame_id + 2)]
+    assert Frame.from_bytes(frames[frame_id]).frame_id == 100
+    assert frames[-1] is None
+
+
+def test_config_round_trip(pair):
+    producer, _ = pair
+    clone = hybrid.HybridBroker.from_config(producer.to_config())
+    assert clone.to_config() == producer.to_config()
+
+
+def test_missing_pyzmq_is_reported(monkeypatch):
+    monkeypatch.setattr(hybrid, "zmq", None)
+    with pytest.raises(ImportError, match="edgeflow\\[zmq\\]"):
+        hybrid.HybridBroker()
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from edgeflow.comms.frame import Frame
+from edgeflow.comms.packing import pack_meta, unpack_meta
+
+
+def _round_trip(meta):
+    return unpack_meta(pack_meta(meta))
+
+
+def test_scalars_and_containers():
+    meta = {"none": None, "flag": True, "n": -3, "big": 1 << 70, "f": 0.5,
+            "s": "한글", "b": b"\x00\x01", "nested": {"items": [1, "two", [3.0]]}}
+    assert _round_trip(meta) == meta
+
+
+def test_numpy_scalars_become_python_values():
+    assert _round_trip({"i": np.int32(4), "f": np.float32(0.25), "b": np.bool_(True)}) == {"i": 4, "f": 0.25, "b": True}
+
+
+def test_array_round_trip_is_read_only_view():
+    boxes = np.arange(8, dtype=np.float32).reshape(2, 4)
+    got = _round_trip({"boxes": boxes})["boxes"]
+    assert got.dtype == boxes.dtype and np.array_equal(got, boxes)
+    assert not got.flags.writeable
+    with pytest.raises(ValueError):
+        got[0, 0] = 1
+    got.copy()[0, 0] = 1  # a copy is writable
+
+
+def test_structured_array_falls_back_to_columns():
+    records = np.zeros(2, [("id", "<i4"), ("score", "<f4"), ("box", "<f4", (4,))])
+    records["id"] = [7, 8]
+    got = _round_trip({"det": records})["det"]
+    assert set(got) == {"id", "score", "box"}
+    assert got["id"].tolist() == [7, 8]
+    assert got["box"].shape == (2, 4)
+
+
+def test_datetime_arrays_fall_back_to_strings():
+    stamps = np.array(["2024-01-01T00:00:00", "2024-01-02T12:30:00"], dtype="M8[s]")
+    got = _round_trip({"t": stamps, "d": np.array([1, 2], dtype="m8[s]")})
+    assert got["t"] == ["2024-01-01T00:00:00", "2024-01-02T12:30:00"]
+    assert got["d"] == ["1 seconds", "2 seconds"]
+
+
+def test_structured_meta_through_frame():
+    records = np.zeros(1, [("when", "M8[ms]"), ("x", "<f8")])
+    frame = Frame.from_bytes(Frame(1, 0.0, {"rec": records}, np.zeros((2, 2), np.uint8), codec="raw").to_bytes())
+    assert frame.meta["rec"]["when"] == ["1970-01-01T00:00:00.000"]
+    assert frame.meta["rec"]["x"].tolist() == [0.0]
+
+
+def test_unsupported_type_raises():
+    with pytest.raises(TypeError):
+        pack_meta({"obj": object()})